@@ -97,6 +97,8 @@ _wu_active_key: str = ""
 _wu_key_lock = asyncio.Lock()
 _http_client: Optional[httpx.AsyncClient] = None
 _http_client_lock = asyncio.Lock()
+_amap_live_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_AMAP_LIVE_CACHE_MAX = 256
 _host_cooldown_until: Dict[str, float] = {}
 _tianqi_session_warmed_at: Optional[float] = None
 _tianqi_url_owner: Dict[str, str] = {}
@@ -1566,6 +1568,21 @@ class AMapWeatherDataSource:
                 "data_mode": "simulated",
             }
 
+        # AMap refreshes live weather roughly hourly, so successive polls for a
+        # city usually return the exact same report. (adcode, reporttime) is
+        # AMap's own version stamp for it; reuse the normalized dict when
+        # neither has rotated instead of re-parsing.
+        cache_key: Optional[Tuple[str, str]] = None
+        lives = raw_data.get("lives")
+        if isinstance(lives, list) and lives and isinstance(lives[0], dict):
+            adcode = str(lives[0].get("adcode") or "")
+            report_time = str(lives[0].get("reporttime") or "")
+            if adcode and report_time:
+                cache_key = (adcode, report_time)
+                cached = _amap_live_cache.get(cache_key)
+                if cached is not None:
+                    return dict(cached)
+
         live, err = parse_amap_live(raw_data)
         if err:
             return {"error": "amap_parse_failed", "message": err}
@@ -1574,7 +1591,7 @@ class AMapWeatherDataSource:
 
         rain_1h, rain_24h, rain_note = estimate_rain_from_weather_text(live.weather)
         wind_speed = wind_level_to_speed_ms(live.wind_power_level)
-        return {
+        result = {
             "rain_24h_est": float(rain_24h) if rain_24h is not None else None,
             "rain_1h_est": float(rain_1h) if rain_1h is not None else None,
             "wind_speed": float(wind_speed or 0),
@@ -1587,6 +1604,11 @@ class AMapWeatherDataSource:
             "precipitation_note": rain_note,
             "data_mode": "live",
         }
+        if cache_key is not None:
+            if len(_amap_live_cache) >= _AMAP_LIVE_CACHE_MAX:
+                _amap_live_cache.pop(next(iter(_amap_live_cache)))
+            _amap_live_cache[cache_key] = dict(result)
+        return result
 
 
 class WeatherUndergroundApiSource:
@@ -2187,4 +2209,4 @@ async def get_neighbor_average(code: str, metric: str) -> float:
 
     rng = _deterministic_rng(code + "_neighbor")
     return round(rng.uniform(20, 70), 2)
-
+
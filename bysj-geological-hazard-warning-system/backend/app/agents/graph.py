@@ -4,9 +4,16 @@ import asyncio
 import hashlib
 import json
 import re
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 from langgraph.graph import END, StateGraph
 from sqlalchemy import select
 from typing_extensions import TypedDict
@@ -24,6 +31,16 @@ llm_runtime = build_llm_runtime(settings)
 
 LEVELS = ["green", "yellow", "orange", "red"]
 
+# Frozen at module level so every call sends a byte-identical prefix; OpenAI-compatible
+# providers (DeepSeek/OpenAI/Qwen) can then serve the system prompt from their prefix
+# cache instead of re-prefilling it on each refinement round.
+LLM_REFINE_SYSTEM_PROMPT = (
+    "你是地质灾害预警复核助手。请对给定地区做轻量复核，只在必要时调整等级。"
+    "输出JSON: {\"results\":[{\"region_code\":str,\"level\":\"green|yellow|orange|red\","
+    "\"confidence_delta\":float,\"reason_append\":str}]}"
+    "其中confidence_delta范围[-0.15,0.15]。reason_append 必须为中文、简短、可解释（不超过30字）。不要输出其他文字。"
+)
+
 
 def _has_cjk(text: str) -> bool:
     for ch in str(text or ""):
@@ -32,10 +49,13 @@ def _has_cjk(text: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=64)
 def _display_quality_note(note: str) -> str:
     """
     Keep user-facing notes concise and Chinese-only.
     We still keep full `source_status` + logs for debugging.
+    Quality notes come from a small set of canonical strings, so the
+    regex cleanup is memoized instead of re-run per region.
     """
     text = str(note or "").strip()
     if not text:
@@ -117,7 +137,7 @@ class WarningState(TypedDict, total=False):
     force_llm: bool
     collected_data: Dict[str, Any]
     previous_snapshot: Dict[str, Any]
-    changed_regions: List[str]
+    changed_regions: frozenset[str]
     analysis: Dict[str, Any]
     llm_refinement: Dict[str, Any]
     decisions: Dict[str, Any]
@@ -127,14 +147,13 @@ def _clamp(v: float, low: float, high: float) -> float:
     return max(low, min(high, v))
 
 
+# Decision thresholds as bin edges; bisect turns the level lookup into a
+# single C-level search instead of three Python comparisons per call.
+_LEVEL_EDGES = (25.0, 50.0, 75.0)
+
+
 def _level_from_score(score: float) -> str:
-    if score < 25:
-        return "green"
-    if score < 50:
-        return "yellow"
-    if score < 75:
-        return "orange"
-    return "red"
+    return LEVELS[bisect_right(_LEVEL_EDGES, score)]
 
 
 def _distance_to_nearest_threshold(score: float) -> float:
@@ -232,7 +251,12 @@ def _parse_latest_warning_snapshot(region_code: str) -> Dict[str, Any]:
         meteorology: Dict[str, Any] = {}
         if warning.meteorology:
             try:
-                meteorology = json.loads(warning.meteorology)
+                # Decoded once per region per run; orjson is markedly faster
+                # on these payloads when installed.
+                if orjson is not None:
+                    meteorology = orjson.loads(warning.meteorology)
+                else:
+                    meteorology = json.loads(warning.meteorology)
             except Exception:
                 meteorology = {}
         return {
@@ -375,25 +399,10 @@ def _infer_hazard_candidates(data: Dict[str, Any]) -> List[str]:
     return []
 
 
-def _adjacency(regions: List[RegionInput]) -> Dict[str, List[str]]:
-    by_prefix: Dict[str, List[str]] = {}
-    for region in regions:
-        code = str(region["code"])
-        prefix = code[:2]
-        by_prefix.setdefault(prefix, []).append(code)
-
-    graph: Dict[str, List[str]] = {}
-    for region in regions:
-        code = str(region["code"])
-        neighbors = [c for c in by_prefix.get(code[:2], []) if c != code]
-        graph[code] = neighbors
-    return graph
-
-
 async def coordinator_agent(state: WarningState) -> WarningState:
     state.setdefault("collected_data", {})
     state.setdefault("previous_snapshot", {})
-    state.setdefault("changed_regions", [])
+    state.setdefault("changed_regions", frozenset())
     state.setdefault("analysis", {})
     state.setdefault("llm_refinement", {})
     state.setdefault("decisions", {})
@@ -530,11 +539,12 @@ async def data_collector_agent(state: WarningState) -> WarningState:
 
     state["collected_data"] = collected
     state["previous_snapshot"] = previous_snapshot
-    state["changed_regions"] = [
+    # Materialized as a frozenset once here; downstream agents only do membership tests.
+    state["changed_regions"] = frozenset(
         code
         for code, data in collected.items()
         if data.get("change_score", 0) >= 0.12 or not previous_snapshot.get(code)
-    ]
+    )
     return state
 
 
@@ -663,13 +673,15 @@ async def data_validation_agent(state: WarningState) -> WarningState:
     return state
 
 
-async def local_risk_agent(state: WarningState) -> WarningState:
+def _compute_local_risk(
+    collected: Dict[str, Any], previous_snapshot: Dict[str, Any]
+) -> Dict[str, Any]:
     analysis: Dict[str, Any] = {}
 
-    for code, data in state.get("collected_data", {}).items():
+    for code, data in collected.items():
         quality_score = float(data.get("data_quality_score", 0.6))
         change_score = float(data.get("change_score", 0))
-        previous = state.get("previous_snapshot", {}).get(code, {})
+        previous = previous_snapshot.get(code, {})
         met_payload = data.get("meteorology", {}) if isinstance(data.get("meteorology"), dict) else {}
         geo_payload = data.get("geology", {}) if isinstance(data.get("geology"), dict) else {}
         has_met = _has_numeric_features(met_payload, ["rain_24h", "rain_1h", "soil_moisture", "wind_speed"])
@@ -806,27 +818,42 @@ async def local_risk_agent(state: WarningState) -> WarningState:
             "confidence_reason": confidence_reason,
         }
 
-    state["analysis"] = analysis
+    return analysis
+
+
+async def local_risk_agent(state: WarningState) -> WarningState:
+    # Pure CPU work: run it off the event loop so concurrent workflows'
+    # pending I/O (LLM calls, scraper fetches) keeps progressing.
+    state["analysis"] = await asyncio.to_thread(
+        _compute_local_risk,
+        state.get("collected_data", {}),
+        state.get("previous_snapshot", {}),
+    )
     return state
 
 
 async def neighbor_influence_agent(state: WarningState) -> WarningState:
     analysis = state.get("analysis", {})
-    adjacency = _adjacency(state.get("regions", []))
     weight = _clamp(float(settings.neighbor_influence_weight), 0.0, 0.5)
 
+    # Neighbors share the same province prefix, so one accumulation pass over
+    # analysis replaces the per-region neighbor scans (O(R) instead of O(R*k))
+    # and makes smoothing independent of dict iteration order.
+    prefix_sum: Dict[str, float] = {}
+    prefix_count: Dict[str, int] = {}
     for code, item in analysis.items():
-        neighbors = adjacency.get(code, [])
-        if not neighbors:
-            continue
-        neighbor_scores = [
-            float(analysis[n].get("risk_score", 0)) for n in neighbors if n in analysis
-        ]
-        if not neighbor_scores:
+        prefix = str(code)[:2]
+        prefix_sum[prefix] = prefix_sum.get(prefix, 0.0) + float(item.get("risk_score", 0))
+        prefix_count[prefix] = prefix_count.get(prefix, 0) + 1
+
+    for code, item in analysis.items():
+        prefix = str(code)[:2]
+        count = prefix_count.get(prefix, 0)
+        if count <= 1:
             continue
 
         local_score = float(item.get("risk_score", 0))
-        neighbor_avg = sum(neighbor_scores) / len(neighbor_scores)
+        neighbor_avg = (prefix_sum[prefix] - local_score) / (count - 1)
         adjusted = (1 - weight) * local_score + weight * neighbor_avg
 
         item["risk_score"] = round(adjusted, 2)
@@ -851,7 +878,7 @@ async def neighbor_influence_agent(state: WarningState) -> WarningState:
 async def llm_refinement_agent(state: WarningState) -> WarningState:
     analysis = state.get("analysis", {})
     collected = state.get("collected_data", {})
-    changed = set(state.get("changed_regions", []))
+    changed = state.get("changed_regions") or frozenset()
     force_llm = bool(state.get("force_llm", True))
 
     if not llm_runtime:
@@ -861,20 +888,17 @@ async def llm_refinement_agent(state: WarningState) -> WarningState:
         state["llm_refinement"] = {}
         return state
 
-    candidates: List[str] = []
-    for code, item in analysis.items():
-        confidence = float(item.get("confidence", 0.5))
-        if code in changed or confidence < float(settings.llm_confidence_threshold):
-            candidates.append(code)
-
-    if force_llm and not candidates:
-        sorted_codes = sorted(
-            analysis.keys(),
-            key=lambda c: float(analysis[c].get("risk_score", 0)),
-            reverse=True,
-        )
-        if sorted_codes:
-            candidates = [sorted_codes[0]]
+    threshold = float(settings.llm_confidence_threshold)
+    candidates: List[str] = [
+        code
+        for code, item in analysis.items()
+        if code in changed or float(item.get("confidence", 0.5)) < threshold
+    ]
+
+    if force_llm and not candidates and analysis:
+        # Only the top-1 region is needed; a linear max avoids sorting all codes.
+        top_code = max(analysis.keys(), key=lambda c: float(analysis[c].get("risk_score", 0)))
+        candidates = [top_code]
 
     candidates = candidates[: max(1, int(settings.llm_refine_max_regions))]
     if not candidates:
@@ -909,33 +933,32 @@ async def llm_refinement_agent(state: WarningState) -> WarningState:
             }
         )
 
-    system_prompt = (
-        "你是地质灾害预警复核助手。请对给定地区做轻量复核，只在必要时调整等级。"
-        "输出JSON: {\"results\":[{\"region_code\":str,\"level\":\"green|yellow|orange|red\","
-        "\"confidence_delta\":float,\"reason_append\":str}]}"
-        "其中confidence_delta范围[-0.15,0.15]。reason_append 必须为中文、简短、可解释（不超过30字）。不要输出其他文字。"
-    )
-    user_prompt = json.dumps(
-        {
-            "timestamp": state.get("timestamp").isoformat() if state.get("timestamp") else None,
-            "provider": llm_runtime.provider,
-            "items": payload,
-        },
-        ensure_ascii=False,
-    )
+    prompt_doc = {
+        "timestamp": state.get("timestamp").isoformat() if state.get("timestamp") else None,
+        "provider": llm_runtime.provider,
+        "items": payload,
+    }
+    if orjson is not None:
+        # orjson emits unescaped UTF-8, matching ensure_ascii=False.
+        user_prompt = orjson.dumps(prompt_doc).decode("utf-8")
+    else:
+        user_prompt = json.dumps(prompt_doc, ensure_ascii=False)
 
     try:
         resp = await llm_runtime.client.chat.completions.create(
             model=llm_runtime.model,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": LLM_REFINE_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ],
             response_format={"type": "json_object"},
             temperature=0.1,
-            max_tokens=max(180, 60 * len(payload)),
+            # Each item emits ~4 short fields (reason_append is capped at 30 chars),
+            # so a tight decode budget finishes generation earlier.
+            max_tokens=max(120, 40 * len(payload) + 32),
         )
-        parsed = json.loads(resp.choices[0].message.content or "{}")
+        raw = resp.choices[0].message.content or "{}"
+        parsed = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except Exception:
         parsed = {"results": []}
 
@@ -958,17 +981,26 @@ async def llm_refinement_agent(state: WarningState) -> WarningState:
     return state
 
 
-async def decision_maker_agent(state: WarningState) -> WarningState:
-    analysis = state.get("analysis", {})
-    refinement = state.get("llm_refinement", {})
-    collected = state.get("collected_data", {})
+def _compute_decisions(
+    analysis: Dict[str, Any], refinement: Dict[str, Any], collected: Dict[str, Any]
+) -> Dict[str, Any]:
+    def _valid_geo(value: Any) -> bool:
+        if value in (None, "", "unknown"):
+            return False
+        if isinstance(value, (int, float)) and float(value) <= 0:
+            return False
+        return True
 
     decisions: Dict[str, Any] = {}
     for code, item in analysis.items():
         level = item.get("level", "green")
         confidence = float(item.get("confidence", 0.5))
         reason = str(item.get("factors", ""))
-        confidence_breakdown = dict(item.get("confidence_breakdown", {}))
+        # Reference the analysis breakdown by identity instead of copying it.
+        # The analysis state is not read again after decisions are built, so
+        # finalizing llm_delta/final_confidence in place is safe and saves one
+        # 9-key dict allocation per region.
+        confidence_breakdown = item.get("confidence_breakdown") or {}
         confidence_reason = str(item.get("confidence_reason", "")).strip()
         hazard_candidates = list(item.get("hazard_candidates", []))
         llm_delta = 0.0
@@ -982,22 +1014,26 @@ async def decision_maker_agent(state: WarningState) -> WarningState:
             if llm_item.get("reason_append"):
                 reason = f"{reason}；LLM复核：{llm_item['reason_append']}"
 
-        met = dict(collected.get(code, {}).get("meteorology", {}))
+        row = collected.get(code, {})
+        met_payload = row.get("meteorology", {})
+        geo_payload = row.get("geology", {})
         # Persist key geology features into the stored "meteorology" JSON so
         # future runs can reuse them when geology sources are temporarily missing.
-        geo_payload = dict(collected.get(code, {}).get("geology", {}))
-        for k in ["slope", "fault_distance", "lithology"]:
-            v = geo_payload.get(k)
-            if v in (None, "", "unknown"):
-                continue
-            if isinstance(v, (int, float)) and float(v) <= 0:
-                continue
-            met.setdefault(k, v)
-        met["confidence"] = round(confidence, 3)
-        met["risk_score"] = item.get("risk_score")
-        met["changed_fields"] = item.get("changed_fields", [])
-        met["data_quality_note"] = item.get("data_quality_note", "")
-        met["source_status"] = collected.get(code, {}).get("source_status", {})
+        # Built as a single dict literal (one allocation + one merge) instead of
+        # copy-then-setdefault; meteorology keys still win over geology ones.
+        met = {
+            **met_payload,
+            **{
+                k: geo_payload.get(k)
+                for k in ("slope", "fault_distance", "lithology")
+                if k not in met_payload and _valid_geo(geo_payload.get(k))
+            },
+            "confidence": round(confidence, 3),
+            "risk_score": item.get("risk_score"),
+            "changed_fields": item.get("changed_fields", []),
+            "data_quality_note": item.get("data_quality_note", ""),
+            "source_status": row.get("source_status", {}),
+        }
         if confidence_breakdown:
             confidence_breakdown["llm_delta"] = round(llm_delta, 3)
             confidence_breakdown["final_confidence"] = round(confidence, 3)
@@ -1021,7 +1057,16 @@ async def decision_maker_agent(state: WarningState) -> WarningState:
             "meteorology": met,
         }
 
-    state["decisions"] = decisions
+    return decisions
+
+
+async def decision_maker_agent(state: WarningState) -> WarningState:
+    state["decisions"] = await asyncio.to_thread(
+        _compute_decisions,
+        state.get("analysis", {}),
+        state.get("llm_refinement", {}),
+        state.get("collected_data", {}),
+    )
     return state
 
 
@@ -1073,6 +1118,6 @@ async def run_warning_workflow(
         )
 
     return JiusiWorkflowOutput(timestamp=timestamp, results=results)
-
-
-
+
+
+
@@ -2,10 +2,26 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import httpx
 from openai import AsyncOpenAI
 
 from app.core.config import Settings
 
+_llm_http_client: httpx.AsyncClient | None = None
+
+
+def _get_llm_http_client() -> httpx.AsyncClient:
+    # Shared transport for all LLM runtimes in this process: keep-alive reuse
+    # avoids a TCP+TLS handshake per refinement/chat call and gives concurrent
+    # calls a wide connection pool instead of the OpenAI SDK default.
+    global _llm_http_client
+    if _llm_http_client is None:
+        _llm_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(30.0),
+        )
+    return _llm_http_client
+
 
 @dataclass
 class LLMRuntime:
@@ -18,7 +34,7 @@ def _build(provider: str, api_key: str, base_url: str, model: str) -> LLMRuntime
     return LLMRuntime(
         provider=provider,
         model=model,
-        client=AsyncOpenAI(api_key=api_key, base_url=base_url),
+        client=AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=_get_llm_http_client()),
     )
 
 
@@ -1,8 +1,9 @@
 ﻿from __future__ import annotations
 
+import hashlib
 import json
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 from urllib.parse import urlparse
 
 try:
@@ -10,66 +11,301 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     BeautifulSoup = None
 
+try:
+    import lxml  # noqa: F401  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    _BS_PARSER = "html.parser"
+else:
+    # lxml's C parser is several times faster than the pure-Python
+    # html.parser on the 100KB+ pages the scrapers pull in.
+    _BS_PARSER = "lxml"
+
 _NUMBER = r"([0-9]+(?:\.[0-9]+)?)"
 
+# All patterns are compiled once at import. The parsers run inside the scraping
+# hot loop and `re`'s internal cache is too small for this many unicode-heavy
+# patterns to stay resident.
+_RE_WIND_LEVEL = re.compile(r"([0-9]{1,2})\s*级")
+_RE_TIANQI_WEEK_DIV = re.compile(
+    r'<div[^>]*class=["\'][^"\']*week[^"\']*["\'][^>]*>(.*?)</div>',
+    re.IGNORECASE | re.DOTALL,
+)
+# One pass picks up both condition ("wea") and wind ("win") spans; the kind
+# group tells them apart afterwards.
+_RE_TIANQI_SPAN = re.compile(
+    r'<span[^>]*class=["\'][^"\']*(?P<kind>wea|win)[^"\']*["\'][^>]*>(?P<body>.*?)</span>',
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_TIANQI_COND_JSON = re.compile(
+    r'"(?:wea|weather)"\s*:\s*"([^"]{1,20})"', re.IGNORECASE | re.DOTALL
+)
+
+
+def _combine_patterns(patterns: list[str]) -> re.Pattern:
+    """Join a pattern family into one alternation scanned in a single pass.
+
+    Each source pattern carries exactly one capture group, so in the combined
+    regex pattern N owns group N and ``match.lastindex`` identifies which
+    family member hit.
+    """
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+_RAIN_24H_RE = _combine_patterns(
+    [
+        rf"(?:24\s*h|24\s*hour|24\s*hours)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|millimeter)",
+        rf"(?:24小时(?:降水|降雨)?|日降雨量)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|毫米)?",
+        rf"(?:降水量|雨量)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|毫米)",
+    ]
+)
+_RAIN_1H_RE = _combine_patterns(
+    [
+        rf"(?:1\s*h|1\s*hour)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|millimeter)",
+        rf"(?:1小时(?:降水|降雨)?|小时雨量)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|毫米)?",
+    ]
+)
+_WIND_SPEED_RE = _combine_patterns(
+    [
+        rf"(?:wind\s*speed)[^0-9]{{0,16}}{_NUMBER}\s*(?:m/s|mps|km/h|kmh)",
+        rf"(?:风速|平均风速)[^0-9]{{0,16}}{_NUMBER}\s*(?:m/s|米/秒|km/h)?",
+    ]
+)
+_HUMIDITY_RE = _combine_patterns(
+    [
+        rf"(?:humidity|relative\s*humidity)[^0-9]{{0,16}}{_NUMBER}\s*%",
+        rf"(?:湿度|相对湿度)[^0-9]{{0,16}}{_NUMBER}\s*%",
+    ]
+)
+_TIANQI_HUMIDITY_RE = _combine_patterns(
+    [
+        rf"(?:湿度|相对湿度)[^0-9]{{0,12}}{_NUMBER}\s*%",
+    ]
+)
+_TIANQI_WIND_LEVEL_RE = _combine_patterns(
+    [
+        rf"(?:风向|风力|风速)?[^0-9]{{0,12}}{_NUMBER}\s*级",
+    ]
+)
+_TIANQI_WIND_SPEED_RE = _combine_patterns(
+    [
+        rf"(?:风速)[^0-9]{{0,12}}{_NUMBER}\s*(?:m/s|米/秒)",
+    ]
+)
+_TIANQI_RAIN_24H_RE = _combine_patterns(
+    [
+        rf"(?:降水量|累计降水|过24小时降水)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|毫米)?",
+    ]
+)
+_TIANQI_RAIN_1H_RE = _combine_patterns(
+    [
+        rf"(?:小时降水|小时雨量)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|毫米)?",
+    ]
+)
+_WEATHER_COM_CN_RAIN_1H_RE = _combine_patterns(
+    [
+        rf"(?:小时雨量|当前降水)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|毫米)?",
+    ]
+)
+# Ordered: earlier tokens win when several rock names appear, matching the
+# old dict-iteration priority.
+_LITHOLOGY_TOKENS = (
+    ("granite", "granite"),
+    ("sandstone", "sandstone"),
+    ("shale", "shale"),
+    ("limestone", "limestone"),
+    ("花岗岩", "granite"),
+    ("砂岩", "sandstone"),
+    ("页岩", "shale"),
+    ("石灰岩", "limestone"),
+)
+_LITHOLOGY_RE = re.compile(
+    "|".join(re.escape(token) for token, _ in _LITHOLOGY_TOKENS), re.IGNORECASE
+)
+_LITHOLOGY_LOOKUP = {token: mapped for token, mapped in _LITHOLOGY_TOKENS}
+_LITHOLOGY_PRIORITY = {token: i for i, (token, _) in enumerate(_LITHOLOGY_TOKENS)}
+
+_SLOPE_RE = _combine_patterns(
+    [
+        rf"(?:slope|slope\s*angle)[^0-9]{{0,16}}{_NUMBER}\s*(?:deg|degree|°)",
+        rf"(?:坡度|坡角)[^0-9]{{0,16}}{_NUMBER}\s*(?:°|度)?",
+    ]
+)
+_FAULT_DISTANCE_RE = _combine_patterns(
+    [
+        rf"(?:fault\s*distance|distance\s*to\s*fault)[^0-9]{{0,16}}{_NUMBER}\s*(?:km|kilometer)",
+        rf"(?:断层距离|距离断层)[^0-9]{{0,16}}{_NUMBER}\s*(?:km|公里)?",
+    ]
+)
+
 
 def _source_host(raw_data: Dict[str, Any]) -> str:
     source_url = str(raw_data.get("_source_url") or "").strip()
     return (urlparse(source_url).hostname or "").lower()
 
 
+# Scraped pages are often byte-identical between the half-hourly workflow
+# runs; memoize the text-parsing result per (host, raw_text digest) so an
+# unchanged page costs one hash instead of a full strip/regex/soup pass.
+_PARSE_CACHE_MAX = 512
+_weather_parse_cache: Dict[tuple[str, bytes], Dict[str, Any]] = {}
+_geology_parse_cache: Dict[tuple[str, bytes], Dict[str, Any]] = {}
+
+
+def _parse_cache_key(host: str, raw_text: str) -> tuple[str, bytes]:
+    digest = hashlib.blake2b(raw_text.encode("utf-8", "ignore"), digest_size=16).digest()
+    return host, digest
+
+
+def _parse_cache_get(
+    cache: Dict[tuple[str, bytes], Dict[str, Any]], key: tuple[str, bytes]
+) -> Optional[Dict[str, Any]]:
+    hit = cache.get(key)
+    # Copy so callers can mutate their payload without poisoning the cache.
+    return dict(hit) if hit is not None else None
+
+
+def _parse_cache_put(
+    cache: Dict[tuple[str, bytes], Dict[str, Any]],
+    key: tuple[str, bytes],
+    value: Dict[str, Any],
+) -> None:
+    if len(cache) >= _PARSE_CACHE_MAX:
+        cache.pop(next(iter(cache)))
+    cache[key] = dict(value)
+
+
 def _to_float(value: Any) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    text = str(value).strip()
-    if not text:
-        return None
+    # Hot leaf: let float() handle int/float/str (including surrounding
+    # whitespace) directly instead of pre-checking types.
     try:
-        return float(text)
-    except Exception:
+        return float(value)
+    except (TypeError, ValueError):
         return None
 
 
 def _strip_html(raw_html: str) -> str:
-    text = re.sub(r"(?is)<script.*?>.*?</script>", " ", raw_html)
-    text = re.sub(r"(?is)<style.*?>.*?</style>", " ", text)
-    text = re.sub(r"(?is)<[^>]+>", " ", text)
-    text = text.replace("&nbsp;", " ").replace("&amp;", "&")
-    return re.sub(r"\s+", " ", text).strip()
+    # Single index-walk instead of four regex passes: script/style blocks are
+    # skipped with str.find, tags are skipped to the closing ">", and
+    # whitespace is collapsed inline, so only one output string is built.
+    out: list[str] = []
+    lower = raw_html.lower()
+    n = len(raw_html)
+    i = 0
+    pending_space = False
+    while i < n:
+        ch = raw_html[i]
+        if ch == "<":
+            if lower.startswith("<script", i) and (end := lower.find("</script>", i + 7)) >= 0:
+                i = end + 9
+            elif lower.startswith("<style", i) and (end := lower.find("</style>", i + 6)) >= 0:
+                i = end + 8
+            else:
+                # Unterminated script/style degrades to plain tag stripping,
+                # matching the old regex behaviour.
+                end = raw_html.find(">", i + 1)
+                i = n if end < 0 else end + 1
+            pending_space = True
+            continue
+        if ch == "&":
+            if raw_html.startswith("&nbsp;", i):
+                pending_space = True
+                i += 6
+                continue
+            if raw_html.startswith("&amp;", i):
+                if pending_space and out:
+                    out.append(" ")
+                pending_space = False
+                out.append("&")
+                i += 5
+                continue
+        if ch.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if pending_space and out:
+            out.append(" ")
+        pending_space = False
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+_focus_patterns: Dict[tuple[str, ...], re.Pattern] = {}
 
 
 def _focus_window(text: str, anchors: list[str], radius: int = 700) -> str:
     if not text:
         return ""
-    for anchor in anchors:
-        idx = text.find(anchor)
-        if idx >= 0:
+    key = tuple(anchors)
+    pattern = _focus_patterns.get(key)
+    if pattern is None:
+        pattern = re.compile("|".join(re.escape(anchor) for anchor in key))
+        _focus_patterns[key] = pattern
+    # One scan records the first position of every anchor; the window is then
+    # chosen by anchor-list priority, as the old per-anchor find loop did.
+    first_hit: Dict[str, int] = {}
+    for match in pattern.finditer(text):
+        anchor = match.group(0)
+        if anchor not in first_hit:
+            first_hit[anchor] = match.start()
+            if len(first_hit) == len(key):
+                break
+    for anchor in key:
+        idx = first_hit.get(anchor)
+        if idx is not None:
             start = max(0, idx - radius)
             end = min(len(text), idx + radius)
             return text[start:end]
     return ""
 
 
-def _extract_by_patterns(text: str, patterns: list[str]) -> Optional[float]:
-    for pattern in patterns:
-        match = re.search(pattern, text, flags=re.IGNORECASE)
-        if not match:
+def _extract_by_patterns(text: str, combined: re.Pattern) -> Optional[float]:
+    # One scan over the text; among all hits prefer the lowest pattern index
+    # (family order), matching the old try-each-pattern-in-turn priority.
+    best_index: Optional[int] = None
+    best_value: Optional[float] = None
+    for match in combined.finditer(text):
+        index = match.lastindex
+        if index is None or (best_index is not None and index >= best_index):
             continue
-        value = _to_float(match.group(1))
-        if value is not None:
-            return value
-    return None
+        value = _to_float(match.group(index))
+        if value is None:
+            continue
+        best_index, best_value = index, value
+        if index == 1:
+            break
+    return best_value
+
+
+def _iter_json_script_blocks(raw_text: str) -> Iterator[str]:
+    # str.find walk over <script> blocks instead of a DOTALL lazy regex,
+    # which can backtrack quadratically on malformed scraped HTML.
+    lower = raw_text.lower()
+    i = 0
+    while True:
+        start = lower.find("<script", i)
+        if start < 0:
+            return
+        tag_end = lower.find(">", start + 7)
+        if tag_end < 0:
+            return
+        attrs = lower[start + 7 : tag_end]
+        if "application/ld+json" not in attrs and "application/json" not in attrs:
+            # Not a JSON block; resume right after the tag so misnested
+            # markup cannot swallow a later JSON script.
+            i = tag_end + 1
+            continue
+        close = lower.find("</script>", tag_end + 1)
+        if close < 0:
+            return
+        yield raw_text[tag_end + 1 : close]
+        i = close + 9
 
 
 def _extract_json_candidates(raw_text: str) -> list[Dict[str, Any]]:
     candidates: list[Dict[str, Any]] = []
 
-    script_pattern = re.compile(
-        r"(?is)<script[^>]*?(?:application/ld\+json|application/json)[^>]*>(.*?)</script>"
-    )
-    for match in script_pattern.findall(raw_text):
+    for match in _iter_json_script_blocks(raw_text):
         snippet = str(match).strip()
         if not snippet:
             continue
@@ -85,39 +321,53 @@ def _extract_json_candidates(raw_text: str) -> list[Dict[str, Any]]:
     return candidates
 
 
+def _json_walk(payload: Any) -> Iterator[Tuple[Optional[str], Any]]:
+    # Iterative pre-order walk yielding (key, value) pairs in the same order
+    # as the old recursive helpers, without per-node call overhead or a
+    # recursion-depth limit on deeply nested script JSON.
+    stack: list[tuple[Optional[str], Any]] = [(None, payload)]
+    while stack:
+        key, node = stack.pop()
+        yield key, node
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.items())))
+        elif isinstance(node, list):
+            stack.extend((None, item) for item in reversed(node))
+
+
 def _json_find_number(payload: Any, keys: set[str]) -> Optional[float]:
-    if isinstance(payload, dict):
-        for key, value in payload.items():
-            key_l = str(key).lower()
-            if key_l in keys:
-                fv = _to_float(value)
-                if fv is not None:
-                    return fv
-            found = _json_find_number(value, keys)
-            if found is not None:
-                return found
-    elif isinstance(payload, list):
-        for item in payload:
-            found = _json_find_number(item, keys)
-            if found is not None:
-                return found
+    for key, node in _json_walk(payload):
+        if key is not None and str(key).lower() in keys:
+            fv = _to_float(node)
+            if fv is not None:
+                return fv
     return None
 
 
+def _json_find_many(payload: Any, key_map: Dict[str, str]) -> Dict[str, float]:
+    """Resolve several metrics in one walk; key_map maps lowercased candidate
+    keys to canonical metric names. First hit per metric wins, matching the
+    per-metric search order."""
+    found: Dict[str, float] = {}
+    targets = len(set(key_map.values()))
+    for key, node in _json_walk(payload):
+        if key is None:
+            continue
+        metric = key_map.get(str(key).lower())
+        if metric is None or metric in found:
+            continue
+        fv = _to_float(node)
+        if fv is not None:
+            found[metric] = fv
+            if len(found) == targets:
+                break
+    return found
+
+
 def _json_find_text(payload: Any, keys: set[str]) -> Optional[str]:
-    if isinstance(payload, dict):
-        for key, value in payload.items():
-            key_l = str(key).lower()
-            if key_l in keys and value not in (None, ""):
-                return str(value)
-            found = _json_find_text(value, keys)
-            if found:
-                return found
-    elif isinstance(payload, list):
-        for item in payload:
-            found = _json_find_text(item, keys)
-            if found:
-                return found
+    for key, node in _json_walk(payload):
+        if key is not None and str(key).lower() in keys and node not in (None, ""):
+            return str(node)
     return None
 
 
@@ -139,18 +389,23 @@ def _parse_wttr_weather(raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     if isinstance(weather, list) and weather and isinstance(weather[0], dict):
         hourly = weather[0].get("hourly")
         if isinstance(hourly, list):
-            hourly_precip: list[float] = []
+            precip_total = 0.0
+            precip_max = 0.0
+            precip_seen = False
             for item in hourly:
                 if not isinstance(item, dict):
                     continue
                 p = _to_float(item.get("precipMM"))
                 if p is not None:
-                    hourly_precip.append(p)
-            if hourly_precip:
-                rain_24h = float(sum(hourly_precip))
+                    precip_total += p
+                    if p > precip_max:
+                        precip_max = p
+                    precip_seen = True
+            if precip_seen:
+                rain_24h = precip_total
                 if rain_1h is None:
                     # wttr hourly granularity is usually 3h; normalize to 1h.
-                    rain_1h = float(max(hourly_precip)) / 3.0
+                    rain_1h = precip_max / 3.0
 
     return {
         "rain_24h": round(float(rain_24h), 2),
@@ -161,38 +416,15 @@ def _parse_wttr_weather(raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
-def _parse_weather_from_text(raw_text: str) -> Dict[str, Any]:
-    text = _strip_html(raw_text)
+def _parse_weather_from_text(raw_text: str, stripped: Optional[str] = None) -> Dict[str, Any]:
+    # Callers that already stripped the page pass the text through so the
+    # fallback path does not redo the HTML walk.
+    text = stripped if stripped is not None else _strip_html(raw_text)
 
-    rain_24h = _extract_by_patterns(
-        text,
-        [
-            rf"(?:24\s*h|24\s*hour|24\s*hours)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|millimeter)",
-            rf"(?:24\u5c0f\u65f6(?:\u964d\u6c34|\u964d\u96e8)?|\u65e5\u964d\u96e8\u91cf)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|\u6beb\u7c73)?",
-            rf"(?:\u964d\u6c34\u91cf|\u96e8\u91cf)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|\u6beb\u7c73)",
-        ],
-    )
-    rain_1h = _extract_by_patterns(
-        text,
-        [
-            rf"(?:1\s*h|1\s*hour)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|millimeter)",
-            rf"(?:1\u5c0f\u65f6(?:\u964d\u6c34|\u964d\u96e8)?|\u5c0f\u65f6\u96e8\u91cf)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|\u6beb\u7c73)?",
-        ],
-    )
-    wind_speed = _extract_by_patterns(
-        text,
-        [
-            rf"(?:wind\s*speed)[^0-9]{{0,16}}{_NUMBER}\s*(?:m/s|mps|km/h|kmh)",
-            rf"(?:\u98ce\u901f|\u5e73\u5747\u98ce\u901f)[^0-9]{{0,16}}{_NUMBER}\s*(?:m/s|\u7c73/\u79d2|km/h)?",
-        ],
-    )
-    humidity = _extract_by_patterns(
-        text,
-        [
-            rf"(?:humidity|relative\s*humidity)[^0-9]{{0,16}}{_NUMBER}\s*%",
-            rf"(?:\u6e7f\u5ea6|\u76f8\u5bf9\u6e7f\u5ea6)[^0-9]{{0,16}}{_NUMBER}\s*%",
-        ],
-    )
+    rain_24h = _extract_by_patterns(text, _RAIN_24H_RE)
+    rain_1h = _extract_by_patterns(text, _RAIN_1H_RE)
+    wind_speed = _extract_by_patterns(text, _WIND_SPEED_RE)
+    humidity = _extract_by_patterns(text, _HUMIDITY_RE)
 
     if all(v is None for v in [rain_24h, rain_1h, wind_speed, humidity]):
         return {"error": "unsupported_scraper_payload", "message": "html_parse_no_metrics"}
@@ -206,54 +438,68 @@ def _parse_weather_from_text(raw_text: str) -> Dict[str, Any]:
     }
 
 
+# Representative m/s per Beaufort level 0-12, indexed by level.
+_BEAUFORT_MPS: tuple[float, ...] = (
+    0.2, 1.5, 3.3, 5.4, 7.9, 10.7, 13.8, 17.1, 20.7, 24.4, 28.4, 32.6, 36.9,
+)
+
+
 def _beaufort_to_mps(level: int) -> float:
-    table = {
-        0: 0.2,
-        1: 1.5,
-        2: 3.3,
-        3: 5.4,
-        4: 7.9,
-        5: 10.7,
-        6: 13.8,
-        7: 17.1,
-        8: 20.7,
-        9: 24.4,
-        10: 28.4,
-        11: 32.6,
-        12: 36.9,
-    }
-    return table.get(max(0, min(12, level)), 0.0)
+    return _BEAUFORT_MPS[max(0, min(12, level))]
+
+
+# Ordered so longer tokens win at the same position (特大暴雨 before 暴雨 etc.);
+# the max-accumulation keeps the old "strongest condition" semantics.
+_RAIN_TOKENS = (
+    ("特大暴雨", 250.0, 35.0),
+    ("大暴雨", 180.0, 25.0),
+    ("暴雨", 100.0, 15.0),
+    ("大雨", 50.0, 8.0),
+    ("中雨", 22.0, 3.6),
+    ("小雨", 8.0, 1.1),
+    ("雷阵雨", 16.0, 2.4),
+    ("阵雨", 9.0, 1.2),
+    ("雨夹雪", 6.0, 0.7),
+    ("冻雨", 8.0, 1.0),
+    ("小雪", 1.8, 0.2),
+    ("中雪", 4.0, 0.4),
+    ("大雪", 8.0, 0.8),
+    ("暴雪", 15.0, 1.5),
+)
+_RAIN_RE = re.compile("|".join(re.escape(token) for token, _, _ in _RAIN_TOKENS))
+_RAIN_LOOKUP = {token: (mm24, mm1) for token, mm24, mm1 in _RAIN_TOKENS}
 
 
 def _estimate_rain_from_condition(text: str) -> tuple[float, float]:
     if not text:
         return 0.0, 0.0
-    candidates = [
-        ("特大暴雨", 250.0, 35.0),
-        ("大暴雨", 180.0, 25.0),
-        ("暴雨", 100.0, 15.0),
-        ("大雨", 50.0, 8.0),
-        ("中雨", 22.0, 3.6),
-        ("小雨", 8.0, 1.1),
-        ("雷阵雨", 16.0, 2.4),
-        ("阵雨", 9.0, 1.2),
-        ("雨夹雪", 6.0, 0.7),
-        ("冻雨", 8.0, 1.0),
-        ("小雪", 1.8, 0.2),
-        ("中雪", 4.0, 0.4),
-        ("大雪", 8.0, 0.8),
-        ("暴雪", 15.0, 1.5),
-    ]
     rain_24h = 0.0
     rain_1h = 0.0
-    for token, mm24, mm1 in candidates:
-        if token in text:
-            rain_24h = max(rain_24h, mm24)
-            rain_1h = max(rain_1h, mm1)
+    for match in _RAIN_RE.finditer(text):
+        mm24, mm1 = _RAIN_LOOKUP[match.group(0)]
+        rain_24h = max(rain_24h, mm24)
+        rain_1h = max(rain_1h, mm1)
     return rain_24h, rain_1h
 
 
-def _extract_tianqi_week_snapshot(raw_html: str) -> Dict[str, Any]:
+def _build_soup(raw_html: str) -> Any:
+    if BeautifulSoup is None:
+        return None
+    try:
+        return BeautifulSoup(raw_html, _BS_PARSER)
+    except Exception:
+        return None
+
+
+def _soup_text(soup: Any) -> str:
+    """Flatten an already-built tree to script/style-free collapsed text,
+    equivalent to _strip_html without a second walk over the raw page."""
+    for tag in soup(["script", "style"]):
+        tag.extract()
+    return " ".join(soup.get_text(" ").split())
+
+
+def _extract_tianqi_week_snapshot(raw_html: str, soup: Any = None) -> Dict[str, Any]:
     snapshot: Dict[str, Any] = {
         "condition_text": "",
         "wind_level": None,
@@ -262,9 +508,10 @@ def _extract_tianqi_week_snapshot(raw_html: str) -> Dict[str, Any]:
     if not raw_html:
         return snapshot
 
-    if BeautifulSoup is not None:
+    if soup is None:
+        soup = _build_soup(raw_html)
+    if soup is not None:
         try:
-            soup = BeautifulSoup(raw_html, "html.parser")
             week_box = soup.find("div", class_=lambda v: isinstance(v, str) and "week" in v)
             if week_box is not None:
                 condition_tokens: list[str] = []
@@ -275,7 +522,7 @@ def _extract_tianqi_week_snapshot(raw_html: str) -> Dict[str, Any]:
                         condition_tokens.append(wea.get_text(strip=True))
                     for win in li.find_all("span", class_=lambda v: isinstance(v, str) and "win" in v):
                         text = win.get_text(strip=True)
-                        for m in re.findall(r"([0-9]{1,2})\s*级", text):
+                        for m in _RE_WIND_LEVEL.findall(text):
                             try:
                                 wind_levels.append(max(0, min(12, int(m))))
                             except Exception:
@@ -291,38 +538,32 @@ def _extract_tianqi_week_snapshot(raw_html: str) -> Dict[str, Any]:
         except Exception:
             pass
 
-    week_match = re.search(
-        r'(?is)<div[^>]*class=["\'][^"\']*week[^"\']*["\'][^>]*>(.*?)</div>',
-        raw_html,
-    )
+    week_match = _RE_TIANQI_WEEK_DIV.search(raw_html)
     container = week_match.group(1) if week_match else raw_html
 
-    condition_nodes = re.findall(
-        r'(?is)<span[^>]*class=["\'][^"\']*(?:wea|weather)[^"\']*["\'][^>]*>(.*?)</span>',
-        container,
-    )
-    if not condition_nodes:
-        condition_nodes = re.findall(r'(?is)"(?:wea|weather)"\s*:\s*"([^"]{1,20})"', raw_html)
-
     conditions: list[str] = []
-    for node in condition_nodes:
-        token = _strip_html(str(node)).strip()
-        if token:
-            conditions.append(token)
+    wind_levels: list[int] = []
+    saw_condition_span = False
+    for span in _RE_TIANQI_SPAN.finditer(container):
+        text = _strip_html(span.group("body"))
+        if span.group("kind").lower() == "wea":
+            saw_condition_span = True
+            if text:
+                conditions.append(text)
+        else:
+            for m in _RE_WIND_LEVEL.findall(text):
+                try:
+                    wind_levels.append(max(0, min(12, int(m))))
+                except Exception:
+                    continue
+
+    if not saw_condition_span:
+        for node in _RE_TIANQI_COND_JSON.findall(raw_html):
+            token = _strip_html(str(node)).strip()
+            if token:
+                conditions.append(token)
     snapshot["condition_text"] = " ".join(conditions)
 
-    wind_nodes = re.findall(
-        r'(?is)<span[^>]*class=["\'][^"\']*(?:win|wind)[^"\']*["\'][^>]*>(.*?)</span>',
-        container,
-    )
-    wind_levels: list[int] = []
-    for node in wind_nodes:
-        text = _strip_html(str(node))
-        for m in re.findall(r"([0-9]{1,2})\s*级", text):
-            try:
-                wind_levels.append(max(0, min(12, int(m))))
-            except Exception:
-                continue
     if wind_levels:
         level = max(wind_levels)
         snapshot["wind_level"] = float(level)
@@ -344,8 +585,11 @@ def _sanitize_weather_output(result: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _parse_tianqi_weather_page(raw_text: str) -> Dict[str, Any]:
-    text = _strip_html(raw_text)
-    week_snapshot = _extract_tianqi_week_snapshot(raw_text)
+    # Parse the page once: the tree feeds the week snapshot and, when
+    # available, also yields the flattened text for the regex extractors.
+    soup = _build_soup(raw_text)
+    week_snapshot = _extract_tianqi_week_snapshot(raw_text, soup=soup)
+    text = _soup_text(soup) if soup is not None else _strip_html(raw_text)
     # Prefer extraction around weather modules, not just page header/navigation.
     focused_main = _focus_window(
         text,
@@ -361,24 +605,9 @@ def _parse_tianqi_weather_page(raw_text: str) -> Dict[str, Any]:
     condition_hint = str(week_snapshot.get("condition_text") or "")
     focused_all = " ".join([focused, condition_hint]).strip()
 
-    humidity = _extract_by_patterns(
-        f"{focused} {text}",
-        [
-            rf"(?:\u6e7f\u5ea6|\u76f8\u5bf9\u6e7f\u5ea6)[^0-9]{{0,12}}{_NUMBER}\s*%",
-        ],
-    )
-    wind_level = _extract_by_patterns(
-        focused,
-        [
-            rf"(?:\u98ce\u5411|风力|风速)?[^0-9]{{0,12}}{_NUMBER}\s*\u7ea7",
-        ],
-    )
-    wind_speed = _extract_by_patterns(
-        focused,
-        [
-            rf"(?:\u98ce\u901f)[^0-9]{{0,12}}{_NUMBER}\s*(?:m/s|\u7c73/\u79d2)",
-        ],
-    )
+    humidity = _extract_by_patterns(f"{focused} {text}", _TIANQI_HUMIDITY_RE)
+    wind_level = _extract_by_patterns(focused, _TIANQI_WIND_LEVEL_RE)
+    wind_speed = _extract_by_patterns(focused, _TIANQI_WIND_SPEED_RE)
 
     if wind_speed is None and week_snapshot.get("wind_speed") is not None:
         wind_speed = _to_float(week_snapshot.get("wind_speed"))
@@ -387,18 +616,8 @@ def _parse_tianqi_weather_page(raw_text: str) -> Dict[str, Any]:
     if wind_speed is None and wind_level is not None:
         wind_speed = _beaufort_to_mps(int(max(0, round(wind_level))))
 
-    explicit_rain_24h = _extract_by_patterns(
-        focused,
-        [
-            rf"(?:\u964d\u6c34\u91cf|\u7d2f\u8ba1\u964d\u6c34|\u8fc724\u5c0f\u65f6\u964d\u6c34)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|\u6beb\u7c73)?",
-        ],
-    )
-    explicit_rain_1h = _extract_by_patterns(
-        focused,
-        [
-            rf"(?:\u5c0f\u65f6\u964d\u6c34|\u5c0f\u65f6\u96e8\u91cf)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|\u6beb\u7c73)?",
-        ],
-    )
+    explicit_rain_24h = _extract_by_patterns(focused, _TIANQI_RAIN_24H_RE)
+    explicit_rain_1h = _extract_by_patterns(focused, _TIANQI_RAIN_1H_RE)
     cond_r24, cond_r1 = _estimate_rain_from_condition(focused_all)
 
     rain_24h = float(explicit_rain_24h if explicit_rain_24h is not None else cond_r24)
@@ -414,7 +633,7 @@ def _parse_tianqi_weather_page(raw_text: str) -> Dict[str, Any]:
             "data_mode": "scraped",
             }
         )
-    parsed = _parse_weather_from_text(raw_text)
+    parsed = _parse_weather_from_text(raw_text, stripped=text)
     if "error" in parsed:
         return parsed
     return _sanitize_weather_output(parsed)
@@ -422,12 +641,7 @@ def _parse_tianqi_weather_page(raw_text: str) -> Dict[str, Any]:
 
 def _parse_weather_com_cn_page(raw_text: str) -> Dict[str, Any]:
     text = _strip_html(raw_text)
-    rain_1h = _extract_by_patterns(
-        text,
-        [
-            rf"(?:\u5c0f\u65f6\u96e8\u91cf|\u5f53\u524d\u964d\u6c34)[^0-9]{{0,16}}{_NUMBER}\s*(?:mm|\u6beb\u7c73)?",
-        ],
-    )
+    rain_1h = _extract_by_patterns(text, _WEATHER_COM_CN_RAIN_1H_RE)
     if rain_1h is not None:
         return {
             "rain_24h": 0.0,
@@ -436,7 +650,7 @@ def _parse_weather_com_cn_page(raw_text: str) -> Dict[str, Any]:
             "humidity": 0.0,
             "data_mode": "scraped",
         }
-    return _parse_weather_from_text(raw_text)
+    return _parse_weather_from_text(raw_text, stripped=text)
 
 
 def _parse_qweather_page(raw_text: str) -> Dict[str, Any]:
@@ -472,22 +686,43 @@ def parse_weather_payload(raw_data: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(raw_text, str) or not raw_text.strip():
         return {"error": "unsupported_scraper_payload", "message": "empty_payload"}
 
+    host = _source_host(raw_data)
+    cache_key = _parse_cache_key(host, raw_text)
+    cached = _parse_cache_get(_weather_parse_cache, cache_key)
+    if cached is not None:
+        return cached
+    parsed = _parse_weather_text_payload(raw_text, host)
+    _parse_cache_put(_weather_parse_cache, cache_key, parsed)
+    return parsed
+
+
+_WEATHER_JSON_KEY_MAP = {
+    "rain_24h": "rain_24h",
+    "precipitation_24h": "rain_24h",
+    "precip24h": "rain_24h",
+    "dailyrain": "rain_24h",
+    "precipmm": "rain_24h",
+    "rain_1h": "rain_1h",
+    "precipitation_1h": "rain_1h",
+    "precip1h": "rain_1h",
+    "humidity": "humidity",
+    "relative_humidity": "humidity",
+    "rh": "humidity",
+    "wind_speed": "wind_speed",
+    "windspeed": "wind_speed",
+    "windspeedkmph": "wind_speed",
+}
+
+
+def _parse_weather_text_payload(raw_text: str, host: str) -> Dict[str, Any]:
     for obj in _extract_json_candidates(raw_text):
-        rain_24h = _json_find_number(
-            obj,
-            {
-                "rain_24h",
-                "precipitation_24h",
-                "precip24h",
-                "dailyrain",
-                "precipmm",
-            },
-        )
-        rain_1h = _json_find_number(obj, {"rain_1h", "precipitation_1h", "precip1h"})
-        humidity = _json_find_number(obj, {"humidity", "relative_humidity", "rh"})
-        wind_speed = _json_find_number(obj, {"wind_speed", "windspeed", "windspeedkmph"})
+        found = _json_find_many(obj, _WEATHER_JSON_KEY_MAP)
+        rain_24h = found.get("rain_24h")
+        rain_1h = found.get("rain_1h")
+        humidity = found.get("humidity")
+        wind_speed = found.get("wind_speed")
 
-        if any(v is not None for v in [rain_24h, rain_1h, humidity, wind_speed]):
+        if found:
             if wind_speed is not None and wind_speed > 35:
                 # Commonly km/h from some weather feeds.
                 wind_speed = wind_speed / 3.6
@@ -502,7 +737,6 @@ def parse_weather_payload(raw_data: Dict[str, Any]) -> Dict[str, Any]:
             )
 
     # Priority 3: domain-specific routing then generic regex fallback.
-    host = _source_host(raw_data)
     if host.endswith("wttr.in"):
         parsed = _parse_weather_from_text(raw_text)
         if "error" not in parsed:
@@ -524,37 +758,19 @@ def parse_weather_payload(raw_data: Dict[str, Any]) -> Dict[str, Any]:
 def _parse_geology_from_text(raw_text: str) -> Dict[str, Any]:
     text = _strip_html(raw_text)
 
-    slope = _extract_by_patterns(
-        text,
-        [
-            rf"(?:slope|slope\s*angle)[^0-9]{{0,16}}{_NUMBER}\s*(?:deg|degree|\u00b0)",
-            rf"(?:\u5761\u5ea6|\u5761\u89d2)[^0-9]{{0,16}}{_NUMBER}\s*(?:\u00b0|\u5ea6)?",
-        ],
-    )
-    fault_distance = _extract_by_patterns(
-        text,
-        [
-            rf"(?:fault\s*distance|distance\s*to\s*fault)[^0-9]{{0,16}}{_NUMBER}\s*(?:km|kilometer)",
-            rf"(?:\u65ad\u5c42\u8ddd\u79bb|\u8ddd\u79bb\u65ad\u5c42)[^0-9]{{0,16}}{_NUMBER}\s*(?:km|\u516c\u91cc)?",
-        ],
-    )
+    slope = _extract_by_patterns(text, _SLOPE_RE)
+    fault_distance = _extract_by_patterns(text, _FAULT_DISTANCE_RE)
 
     lithology = "unknown"
-    lithology_map = {
-        "granite": "granite",
-        "sandstone": "sandstone",
-        "shale": "shale",
-        "limestone": "limestone",
-        "\u82b1\u5c97\u5ca9": "granite",
-        "\u7802\u5ca9": "sandstone",
-        "\u9875\u5ca9": "shale",
-        "\u77f3\u7070\u5ca9": "limestone",
-    }
-    lower = text.lower()
-    for token, mapped in lithology_map.items():
-        if token.lower() in lower:
-            lithology = mapped
-            break
+    best_priority = len(_LITHOLOGY_TOKENS)
+    for match in _LITHOLOGY_RE.finditer(text):
+        token = match.group(0).lower()
+        priority = _LITHOLOGY_PRIORITY[token]
+        if priority < best_priority:
+            best_priority = priority
+            lithology = _LITHOLOGY_LOOKUP[token]
+            if priority == 0:
+                break
 
     if slope is None and fault_distance is None and lithology == "unknown":
         return {"error": "unsupported_scraper_payload", "message": "html_parse_no_metrics"}
@@ -586,6 +802,16 @@ def parse_geology_payload(raw_data: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(raw_text, str) or not raw_text.strip():
         return {"error": "unsupported_scraper_payload", "message": "empty_payload"}
 
+    cache_key = _parse_cache_key(_source_host(raw_data), raw_text)
+    cached = _parse_cache_get(_geology_parse_cache, cache_key)
+    if cached is not None:
+        return cached
+    parsed = _parse_geology_text_payload(raw_text)
+    _parse_cache_put(_geology_parse_cache, cache_key, parsed)
+    return parsed
+
+
+def _parse_geology_text_payload(raw_text: str) -> Dict[str, Any]:
     for obj in _extract_json_candidates(raw_text):
         slope = _json_find_number(obj, {"slope", "terrain_slope", "slope_degree"})
         fault_distance = _json_find_number(obj, {"fault_distance", "fault_distance_km", "fault_km"})
@@ -600,4 +826,4 @@ def parse_geology_payload(raw_data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     return _parse_geology_from_text(raw_text)
-
+
@@ -7,7 +7,6 @@ from celery import Celery
 from celery.schedules import crontab
 
 from app.core.config import get_settings
-from app.routes.warnings import run_and_persist_warning_workflow
 
 settings = get_settings()
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -18,6 +17,10 @@ celery_app = Celery(
     broker=settings.redis_url,
     backend=settings.redis_url,
 )
+# Recycle workers periodically on these long scraping runs and only ack once
+# a run finished, so a killed worker's run is re-delivered.
+celery_app.conf.worker_max_tasks_per_child = 200
+celery_app.conf.task_acks_late = True
 
 
 @celery_app.on_after_configure.connect
@@ -31,4 +34,9 @@ def setup_periodic_tasks(sender, **kwargs):  # type: ignore[no-untyped-def]
 
 @celery_app.task
 def run_warning_workflow_task() -> None:
+    # Imported lazily: pulling the FastAPI route graph (models, DB, HTTP
+    # clients) at celery_app import would bloat every worker that only
+    # needs the beat scheduler.
+    from app.routes.warnings import run_and_persist_warning_workflow
+
     asyncio.run(run_and_persist_warning_workflow(force_llm=True))
@@ -1,12 +1,15 @@
 from functools import lru_cache
 from typing import List
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     database_url: str
+    # Optional explicit asyncpg URL; derived from database_url when empty.
+    async_database_url: str = ""
     redis_url: str
+    redis_max_connections: int = 32
 
     deepseek_api_key: str = ""
     deepseek_base_url: str = "https://api.deepseek.com"
@@ -25,6 +28,11 @@ class Settings(BaseSettings):
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
 
+    # Database pool tuning
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_recycle_seconds: int = 1800
+
     allowed_origins: List[str] = ["*"]
 
     # External API configurations
@@ -89,13 +97,19 @@ class Settings(BaseSettings):
     workflow_max_runtime_seconds: int = 3600 
     workflow_manual_region_limit: int = 100
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        env_prefix = ""
-        case_sensitive = False
+    # frozen=True keeps the instance immutable, so the single cached object
+    # below can be shared safely across threads and pre-fork Celery workers.
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="",
+        case_sensitive=False,
+        frozen=True,
+    )
 
 
 @lru_cache()
 def get_settings() -> Settings:
+    """Parse .env/environment once per process; forked workers inherit the
+    already-built instance from the parent via the cache."""
     return Settings()
@@ -10,12 +10,61 @@ from app.core.config import get_settings
 settings = get_settings()
 
 # Sync engine for traditional operations / 同步引擎用于传统操作
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool sized for the concurrent workflow writers; stale connections are
+# rotated via pool_recycle instead of a pre-ping round trip per checkout.
+engine = create_engine(
+    settings.database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    # A full workflow run persists one warning per selected region (a few
+    # thousand rows at most), so a 2000-row page lets the bulk insert go
+    # out in one or two statements instead of the default 1000-row pages.
+    insertmanyvalues_page_size=2000,
+)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+# Async engine for event-loop callers / 异步引擎供事件循环内的调用方使用
+# Created lazily so importing app.db never requires the asyncpg driver.
+_async_engine = None
+_async_sessionmaker = None
+
+
+def _async_database_url() -> str:
+    if settings.async_database_url:
+        return settings.async_database_url
+    # Derive from the sync URL so a single DATABASE_URL keeps working.
+    url = settings.database_url
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            _async_database_url(),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            insertmanyvalues_page_size=2000,
+        )
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), autocommit=False, autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker
 
-# Async engine placeholder for future scaling / 异步引擎占位符用于未来扩展
-# async_engine = create_async_engine(settings.async_database_url, pool_pre_ping=True)
-# AsyncSessionLocal = async_sessionmaker(async_engine, autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
@@ -36,7 +85,7 @@ def get_db_fastapi() -> Generator[Session, None, None]:
     finally:
         db.close()
 
-# Future async support / 未来异步支持
-# async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
-#     async with AsyncSessionLocal() as session:
-#         yield session
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Async session for code already running on an event loop / 异步会话"""
+    async with get_async_sessionmaker()() as session:
+        yield session
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
 from typing import Any, Dict, Optional, Tuple
 
@@ -18,16 +17,32 @@ class AMapLiveWeather:
     report_time: str
 
 
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    s = str(value).strip()
+    if not s:
+        return None
+    try:
+        return float(s)
+    except Exception:
+        return None
+
+
 def parse_amap_live(payload: Dict[str, Any]) -> Tuple[Optional[AMapLiveWeather], Optional[str]]:
     """
     Parse AMap weatherInfo response (extensions=base).
     Returns (live, error_message).
     """
     try:
-        if str(payload.get("status")) != "1":
+        # Compare the raw values first; the str() casts only run on the
+        # rare non-string payloads instead of on every response.
+        status = payload.get("status")
+        if status != "1" and str(status) != "1":
             return None, str(payload.get("info") or "amap_status_not_1")
-        if str(payload.get("infocode")) != "10000":
-            return None, str(payload.get("infocode") or "amap_infocode_not_10000")
+        infocode = payload.get("infocode")
+        if infocode != "10000" and str(infocode) != "10000":
+            return None, str(infocode or "amap_infocode_not_10000")
         lives = payload.get("lives") or []
         if not isinstance(lives, list) or not lives:
             return None, "amap_no_lives"
@@ -35,25 +50,14 @@ def parse_amap_live(payload: Dict[str, Any]) -> Tuple[Optional[AMapLiveWeather],
         if not item:
             return None, "amap_invalid_lives_item"
 
-        def _f(v: Any) -> Optional[float]:
-            if v is None:
-                return None
-            s = str(v).strip()
-            if not s:
-                return None
-            try:
-                return float(s)
-            except Exception:
-                return None
-
         return (
             AMapLiveWeather(
                 province=str(item.get("province") or ""),
                 city=str(item.get("city") or ""),
                 adcode=str(item.get("adcode") or ""),
                 weather=str(item.get("weather") or ""),
-                temperature_c=_f(item.get("temperature_float") or item.get("temperature")),
-                humidity_pct=_f(item.get("humidity_float") or item.get("humidity")),
+                temperature_c=_to_float(item.get("temperature_float") or item.get("temperature")),
+                humidity_pct=_to_float(item.get("humidity_float") or item.get("humidity")),
                 wind_direction=str(item.get("winddirection") or ""),
                 wind_power_level=parse_wind_power_level(item.get("windpower")),
                 report_time=str(item.get("reporttime") or ""),
@@ -73,14 +77,23 @@ def parse_wind_power_level(value: Any) -> Optional[int]:
     text = str(value).strip()
     if not text:
         return None
-    m = re.search(r"(\\d+)", text)
-    if not m:
-        return None
-    try:
-        lvl = int(m.group(1))
-        return max(0, min(12, lvl))
-    except Exception:
+    # Manual scan over the first digit run; inputs are tiny ("≤3", "12"),
+    # so invoking the regex engine per call was pure overhead.
+    lvl: Optional[int] = None
+    for ch in text:
+        if "0" <= ch <= "9":
+            lvl = (lvl or 0) * 10 + (ord(ch) - 48)
+        elif lvl is not None:
+            break
+    if lvl is None:
         return None
+    return max(0, min(12, lvl))
+
+
+# Approximate m/s per wind power level 0-12, indexed by level.
+_WIND_SPEED_MS: Tuple[float, ...] = (
+    0.0, 1.5, 2.5, 4.0, 5.5, 7.9, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7,
+)
 
 
 def wind_level_to_speed_ms(level: Optional[int]) -> Optional[float]:
@@ -90,22 +103,56 @@ def wind_level_to_speed_ms(level: Optional[int]) -> Optional[float]:
     """
     if level is None:
         return None
-    mapping = {
-        0: 0.0,
-        1: 1.5,
-        2: 2.5,
-        3: 4.0,
-        4: 5.5,
-        5: 7.9,
-        6: 10.8,
-        7: 13.9,
-        8: 17.2,
-        9: 20.8,
-        10: 24.5,
-        11: 28.5,
-        12: 32.7,
-    }
-    return mapping.get(int(level))
+    i = int(level)
+    return _WIND_SPEED_MS[i] if 0 <= i < len(_WIND_SPEED_MS) else None
+
+
+# Ordered most-specific first; the first matching phenomenon wins. Snow/ice
+# entries stay minimal to avoid a false heavy-rain signal, ranges precede the
+# plain intensities they contain ("小雨-中雨" before "小雨"), and the bare
+# "雨" catch-all comes last.
+_RAIN_RULES: Tuple[Tuple[str, float, float], ...] = (
+    ("雪", 1.0, 8.0),
+    ("雨夹雪", 1.0, 8.0),
+    ("冻雨", 1.0, 8.0),
+    ("毛毛雨", 0.5, 2.0),
+    ("细雨", 0.5, 2.0),
+    ("小雨-中雨", 3.0, 18.0),
+    ("中雨-大雨", 7.0, 35.0),
+    ("大雨-暴雨", 14.0, 70.0),
+    ("暴雨-大暴雨", 26.0, 140.0),
+    ("大暴雨-特大暴雨", 38.0, 260.0),
+    ("特大暴雨", 45.0, 320.0),
+    ("大暴雨", 35.0, 220.0),
+    ("暴雨", 25.0, 140.0),
+    ("大雨", 15.0, 80.0),
+    ("中雨", 7.0, 40.0),
+    ("小雨", 3.0, 18.0),
+    ("强雷阵雨", 25.0, 120.0),
+    ("强阵雨", 25.0, 120.0),
+    ("雷阵雨", 12.0, 55.0),
+    ("阵雨", 12.0, 55.0),
+    ("极端降雨", 55.0, 360.0),
+    ("雨", 6.0, 25.0),
+)
+def _compile_rain_classifier():
+    """Unroll _RAIN_RULES into a plain if-ladder at import time.
+
+    The phenomenon strings are a handful of characters, so substring tests
+    beat the regex engine here; generating the ladder from the table keeps
+    the rules in one place instead of hand-maintaining 22 branches.
+    """
+    lines = ["def _classify(text):"]
+    for needle, rain_1h, rain_24h in _RAIN_RULES:
+        lines.append(f"    if {needle!r} in text:")
+        lines.append(f"        return ({rain_1h!r}, {rain_24h!r})")
+    lines.append("    return None")
+    namespace: Dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    return namespace["_classify"]
+
+
+_classify_rain = _compile_rain_classifier()
 
 
 def estimate_rain_from_weather_text(weather_text: str) -> Tuple[Optional[float], Optional[float], str]:
@@ -120,52 +167,9 @@ def estimate_rain_from_weather_text(weather_text: str) -> Tuple[Optional[float],
     if not text:
         return None, None, "amap_weather_text_missing"
 
-    # default: no rain
-    rain_1h = 0.0
-    rain_24h = 0.0
-    note = "根据天气现象估算降雨"
-
-    # Snow/ice: treat as low liquid precipitation; keep minimal values to avoid false heavy-rain signal.
-    if any(k in text for k in ["雪", "雨夹雪", "冻雨"]):
-        return 1.0, 8.0, note
-
-    if "毛毛雨" in text or "细雨" in text:
-        return 0.5, 2.0, note
-
-    # Ranges
-    if "小雨-中雨" in text:
-        return 3.0, 18.0, note
-    if "中雨-大雨" in text:
-        return 7.0, 35.0, note
-    if "大雨-暴雨" in text:
-        return 14.0, 70.0, note
-    if "暴雨-大暴雨" in text:
-        return 26.0, 140.0, note
-    if "大暴雨-特大暴雨" in text:
-        return 38.0, 260.0, note
-
-    # Specific intensities
-    if "特大暴雨" in text:
-        return 45.0, 320.0, note
-    if "大暴雨" in text:
-        return 35.0, 220.0, note
-    if "暴雨" in text:
-        return 25.0, 140.0, note
-    if "大雨" in text:
-        return 15.0, 80.0, note
-    if "中雨" in text:
-        return 7.0, 40.0, note
-    if "小雨" in text:
-        return 3.0, 18.0, note
-
-    if "强雷阵雨" in text or "强阵雨" in text:
-        return 25.0, 120.0, note
-    if "雷阵雨" in text or "阵雨" in text:
-        return 12.0, 55.0, note
-    if "极端降雨" in text:
-        return 55.0, 360.0, note
-    if "雨" in text:
-        return 6.0, 25.0, note
-
-    return rain_1h, rain_24h, "无降雨或未识别为降雨"
+    hit = _classify_rain(text)
+    if hit is not None:
+        return hit[0], hit[1], "根据天气现象估算降雨"
+
+    return 0.0, 0.0, "无降雨或未识别为降雨"
 
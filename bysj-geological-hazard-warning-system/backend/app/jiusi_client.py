@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 import httpx
 
@@ -10,6 +11,24 @@ from app.schemas import JiusiWorkflowInput, JiusiWorkflowOutput
 
 settings = get_settings()
 
+_jiusi_client: Optional[httpx.AsyncClient] = None
+_jiusi_client_lock = asyncio.Lock()
+
+
+async def _get_jiusi_client() -> httpx.AsyncClient:
+    # One shared client keeps the TCP/TLS connection to the workflow endpoint
+    # alive between calls instead of handshaking on every invocation.
+    global _jiusi_client
+    if _jiusi_client is not None:
+        return _jiusi_client
+    async with _jiusi_client_lock:
+        if _jiusi_client is None:
+            limits = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+            _jiusi_client = httpx.AsyncClient(
+                base_url=str(settings.jiusi_api_base), timeout=30.0, limits=limits
+            )
+        return _jiusi_client
+
 
 async def call_jiusi_workflow(
     *, timestamp: datetime, regions: List[str]
@@ -30,18 +49,18 @@ async def call_jiusi_workflow(
         "Authorization": f"Bearer {settings.jiusi_api_key}",
     }
 
-    async with httpx.AsyncClient(base_url=str(settings.jiusi_api_base), timeout=30.0) as client:
-        # 假设九思工作流被配置为 POST /workflow/geohazard
-        # 你可以在九思平台中将该路径改为实际可用路径
-        response = await client.post(
-            "/workflow/geohazard",
-            json=payload.model_dump(mode="json"),
-            headers=headers,
-        )
-        response.raise_for_status()
-        data = response.json()
+    client = await _get_jiusi_client()
+    # 假设九思工作流被配置为 POST /workflow/geohazard
+    # 你可以在九思平台中将该路径改为实际可用路径
+    # model_dump_json 直接产出 JSON 字节，避免 dict 中转后再序列化一遍
+    response = await client.post(
+        "/workflow/geohazard",
+        content=payload.model_dump_json().encode("utf-8"),
+        headers=headers,
+    )
+    response.raise_for_status()
 
     # 这里假定九思返回的数据结构与 JiusiWorkflowOutput 一致
     # 如果不一致，你需要在这里做字段映射/转换
-    return JiusiWorkflowOutput.model_validate(data)
+    return JiusiWorkflowOutput.model_validate_json(response.content)
 
@@ -1,23 +1,22 @@
-from __future__ import annotations
-
-import asyncio
-import logging
-
-from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import get_settings
-from app.db import Base, engine, get_db
+from app.db import Base, engine
 from app.routes import regions as regions_router
 from app.routes import warnings as warnings_router
 from app.websocket_manager import ConnectionManager, redis_subscriber
 
-settings = get_settings()
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-
-app = FastAPI(title="Geological Hazard Warning System")
+settings = get_settings()
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+app = FastAPI(title="Geological Hazard Warning System")
 
 app.add_middleware(
     CORSMiddleware,
@@ -42,7 +41,7 @@ async def on_startup() -> None:
 
 
 @app.websocket("/ws/warnings")
-async def websocket_warnings(websocket: WebSocket, db: Session = Depends(get_db)) -> None:  # noqa: B008
+async def websocket_warnings(websocket: WebSocket) -> None:
     await manager.connect(websocket)
     try:
         # 简单实现：当前端发送任何消息时忽略，仅用于保持连接
@@ -53,6 +52,6 @@ async def websocket_warnings(websocket: WebSocket, db: Session = Depends(get_db)
 
 
 @app.get("/health")
-def health() -> dict[str, str]:
+async def health() -> dict[str, str]:
     return {"status": "ok"}
 
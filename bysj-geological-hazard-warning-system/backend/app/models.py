@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -31,11 +32,17 @@ class Region(Base):
     risk_level = Column(String(16), nullable=False, default="green")
     last_updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    warnings = relationship("Warning", back_populates="region")
+    warnings = relationship(
+        "Warning", back_populates="region", order_by="desc(Warning.created_at)"
+    )
 
 
 class Warning(Base):
     __tablename__ = "warnings"
+    __table_args__ = (
+        # Serves the latest-warning-per-region lookups without a sort step.
+        Index("ix_warnings_region_created", "region_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     region_id = Column(Integer, ForeignKey("regions.id"), nullable=False, index=True)
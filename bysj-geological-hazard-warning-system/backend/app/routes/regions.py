@@ -1,29 +1,67 @@
 from __future__ import annotations
 
+import asyncio
 import json
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, not_, select
+from sqlalchemy.orm import Session, aliased
 
 from app.db import get_db_fastapi as get_db
 from app.models import Region, Warning
 from app.schemas import RegionDetail, RegionListResponse, WarningBase
-from app.warning_filters import is_test_warning
+from app.warning_filters import test_warning_sql_clause
+
+try:  # pragma: no cover - optional dependency
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
 
 router = APIRouter(prefix="/api/regions", tags=["regions"])
 
+_SEED_GEOJSON_URL = "https://geo.datav.aliyun.com/areas_v3/bound/100000_full_city.json"
+
+_http_client: httpx.AsyncClient | None = None
+_http_client_lock = asyncio.Lock()
+
+
+async def _get_http_client() -> httpx.AsyncClient:
+    # Shared client so repeated seeding reuses the connection pool.
+    global _http_client
+    if _http_client is not None:
+        return _http_client
+    async with _http_client_lock:
+        if _http_client is None:
+            limits = httpx.Limits(max_connections=8, max_keepalive_connections=4)
+            _http_client = httpx.AsyncClient(limits=limits, timeout=60.0)
+        return _http_client
+
 
 def _extract_confidence(meteorology: str | None) -> float | None:
     if not meteorology:
         return None
-    try:
-        parsed = json.loads(meteorology)
-    except Exception:
+    # Most rows carry no confidence field; a substring probe skips any
+    # parsing for them.
+    start = meteorology.find('"confidence"')
+    if start < 0:
         return None
-    value = parsed.get("confidence")
+    # Slice the numeric literal out directly instead of materialising the
+    # whole dict tree; anything irregular falls back to a real JSON parse.
+    colon = meteorology.find(":", start + 12)
+    if colon >= 0:
+        end = colon + 1
+        length = len(meteorology)
+        while end < length and meteorology[end] not in ",}":
+            end += 1
+        if end < length:
+            try:
+                return max(0.0, min(1.0, float(meteorology[colon + 1 : end])))
+            except ValueError:
+                pass
     try:
+        parsed = json.loads(meteorology)
+        value = parsed.get("confidence")
         if value is None:
             return None
         return max(0.0, min(1.0, float(value)))
@@ -31,41 +69,72 @@ def _extract_confidence(meteorology: str | None) -> float | None:
         return None
 
 
+def _region_detail_from_row(region: Region) -> RegionDetail:
+    # Rows come straight from the ORM with the right types already, so
+    # model_construct skips the validation pass model_validate would run
+    # on every region in the list response.
+    return RegionDetail.model_construct(
+        id=region.id,
+        name=region.name,
+        code=region.code,
+        parent_code=region.parent_code,
+        longitude=region.longitude,
+        latitude=region.latitude,
+        risk_level=region.risk_level,
+        last_updated_at=region.last_updated_at,
+    )
+
+
+def _warning_from_row(warning: Warning, region_name: str) -> WarningBase:
+    return WarningBase.model_construct(
+        id=warning.id,
+        region_id=warning.region_id,
+        level=warning.level,
+        reason=warning.reason,
+        meteorology=warning.meteorology,
+        confidence=_extract_confidence(warning.meteorology),
+        created_at=warning.created_at,
+        source=warning.source,
+        region_name=region_name,
+    )
+
+
+def _non_test_warning_clause():
+    """SQL mirror of warning_filters.is_test_warning so the test-warning
+    filter runs inside the database."""
+    return not_(test_warning_sql_clause(Warning.source, Warning.reason))
+
+
+def _latest_non_test_warnings(db: Session, region_ids=None) -> dict[int, Warning]:
+    """Latest non-test warning per region via one window-function query."""
+    rn = (
+        func.row_number()
+        .over(partition_by=Warning.region_id, order_by=Warning.created_at.desc())
+        .label("rn")
+    )
+    ranked = select(Warning, rn).where(_non_test_warning_clause())
+    if region_ids is not None:
+        ranked = ranked.where(Warning.region_id.in_(region_ids))
+    subq = ranked.subquery()
+    latest = aliased(Warning, subq)
+    rows = db.execute(select(latest).where(subq.c.rn == 1)).scalars().all()
+    return {w.region_id: w for w in rows}
+
+
 @router.get("", response_model=RegionListResponse)
 def list_regions(db: Session = Depends(get_db)) -> RegionListResponse:
     regions = db.execute(select(Region).order_by(Region.id.asc())).scalars().all()
+    latest_by_region = _latest_non_test_warnings(db)
     items = []
 
     for region in regions:
-        warning_candidates = (
-            db.execute(
-                select(Warning)
-                .where(Warning.region_id == region.id)
-                .order_by(Warning.created_at.desc())
-                .limit(20)
-            )
-            .scalars()
-            .all()
-        )
-        latest_warning = next(
-            (
-                w
-                for w in warning_candidates
-                if not is_test_warning(source=w.source, reason=w.reason)
-            ),
-            None,
-        )
-
-        region_data = RegionDetail.model_validate(region)
+        region_data = _region_detail_from_row(region)
+        latest_warning = latest_by_region.get(region.id)
         if latest_warning:
-            warning = WarningBase.model_validate(latest_warning)
-            warning.region_name = region.name
-            warning.confidence = _extract_confidence(latest_warning.meteorology)
-            region_data.latest_warning = warning
+            region_data.latest_warning = _warning_from_row(latest_warning, region.name)
         items.append(region_data)
 
-    total = db.execute(select(func.count(Region.id))).scalar_one()
-    return RegionListResponse(items=items, total=total)
+    return RegionListResponse(items=items, total=len(regions))
 
 
 @router.get("/{region_id}", response_model=RegionDetail)
@@ -74,60 +143,66 @@ def get_region_detail(region_id: int, db: Session = Depends(get_db)) -> RegionDe
     if region is None:
         raise HTTPException(status_code=404, detail="Region not found")
 
-    warning_candidates = (
-        db.execute(
-            select(Warning)
-            .where(Warning.region_id == region.id)
-            .order_by(Warning.created_at.desc())
-            .limit(20)
-        )
-        .scalars()
-        .all()
-    )
-    latest_warning = next(
-        (
-            w
-            for w in warning_candidates
-            if not is_test_warning(source=w.source, reason=w.reason)
-        ),
-        None,
+    latest_warning = _latest_non_test_warnings(db, region_ids=[region.id]).get(
+        region.id
     )
 
-    data = RegionDetail.model_validate(region)
+    data = _region_detail_from_row(region)
     if latest_warning:
-        warning = WarningBase.model_validate(latest_warning)
-        warning.region_name = region.name
-        warning.confidence = _extract_confidence(latest_warning.meteorology)
-        data.latest_warning = warning
+        data.latest_warning = _warning_from_row(latest_warning, region.name)
     return data
 
 
+class _AsyncByteReader:
+    """Adapts an httpx byte iterator to the async read() ijson expects."""
+
+    def __init__(self, aiter) -> None:
+        self._aiter = aiter
+
+    async def read(self, size: int = -1) -> bytes:
+        try:
+            return await self._aiter.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+
+def _collect_region_row(props: dict, existing_codes: set[str], rows: list[dict]) -> None:
+    adcode = str(props.get("adcode", ""))
+    name = props.get("name", "")
+    if adcode and name and len(adcode) == 6 and adcode not in existing_codes:
+        existing_codes.add(adcode)
+        center = props.get("center", [0, 0])
+        rows.append(
+            {
+                "name": name,
+                "code": adcode,
+                "risk_level": "green",
+                "longitude": center[0] if len(center) > 0 else None,
+                "latitude": center[1] if len(center) > 1 else None,
+            }
+        )
+
+
 @router.post("/seed", response_model=dict)
 async def seed_regions(db: Session = Depends(get_db)) -> dict:
-    async with httpx.AsyncClient() as client:
-        response = await client.get("https://geo.datav.aliyun.com/areas_v3/bound/100000_full_city.json")
-        geojson = response.json()
-
-    count = 0
-    for feature in geojson.get("features", []):
-        props = feature.get("properties", {})
-        adcode = str(props.get("adcode", ""))
-        name = props.get("name", "")
-
-        if adcode and name and len(adcode) == 6:
-            existing = db.execute(select(Region).where(Region.code == adcode)).scalar_one_or_none()
-            if not existing:
-                center = props.get("center", [0, 0])
-                db.add(
-                    Region(
-                        name=name,
-                        code=adcode,
-                        risk_level="green",
-                        longitude=center[0] if len(center) > 0 else None,
-                        latitude=center[1] if len(center) > 1 else None,
-                    )
-                )
-                count += 1
-
+    existing_codes = set(db.execute(select(Region.code)).scalars().all())
+    rows: list[dict] = []
+
+    client = await _get_http_client()
+    if ijson is not None:
+        # The boundary file is several MB, almost all of it geometry we
+        # never read. Streaming only the feature properties keeps memory
+        # flat instead of decoding the whole document at once.
+        async with client.stream("GET", _SEED_GEOJSON_URL) as response:
+            reader = _AsyncByteReader(response.aiter_bytes())
+            async for props in ijson.items_async(reader, "features.item.properties"):
+                _collect_region_row(props, existing_codes, rows)
+    else:
+        response = await client.get(_SEED_GEOJSON_URL)
+        for feature in response.json().get("features", []):
+            _collect_region_row(feature.get("properties", {}), existing_codes, rows)
+
+    if rows:
+        db.execute(insert(Region), rows)
     db.commit()
-    return {"message": f"成功导入 {count} 个新地区"}
+    return {"message": f"成功导入 {len(rows)} 个新地区"}
@@ -4,13 +4,19 @@ import asyncio
 import json
 import logging
 import hashlib
+import time
+import zlib
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
-from redis import Redis
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from redis import ConnectionPool, Redis
+from redis import asyncio as aioredis
+from sqlalchemy import case, delete, func, insert, not_, select, update
 from sqlalchemy.orm import Session
 
 from app.agents.graph import RegionInput, run_warning_workflow
@@ -28,10 +34,14 @@ from app.schemas import (
     TriggerWorkflowAsyncResponse,
     TriggerWorkflowResponse,
     WorkflowStatusResponse,
-    WarningBase,
     WarningListResponse,
 )
-from app.warning_filters import is_test_warning
+from app.warning_filters import test_warning_sql_clause
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 router = APIRouter(prefix="/api/warnings", tags=["warnings"])
 settings = get_settings()
@@ -40,27 +50,149 @@ logger = logging.getLogger(__name__)
 
 last_workflow_state: Dict[str, Any] = {}
 workflow_state_lock = asyncio.Lock()
-workflow_runtime_state: Dict[str, Any] = {
-    "running": False,
-    "current_request_id": None,
-    "current_started_at": None,
-    "last_started_at": None,
-    "last_finished_at": None,
-    "last_error": None,
-    "last_trigger": None,
-    "last_processed_regions": 0,
-    "last_timestamp": None,
-    "total_regions": 0,
-    "selected_regions": 0,
-    "current_region_limit": None,
-}
+
+
+@dataclass(slots=True, frozen=True)
+class RuntimeState:
+    """Immutable snapshot of the workflow runtime state.
+
+    Writers build a new instance with dataclasses.replace under
+    workflow_state_lock and swap the module-level reference; readers grab
+    that reference once and see a coherent snapshot. A single reference
+    read is atomic on CPython and stays correct on free-threaded builds,
+    where field-by-field mutation of a shared dict would not.
+    """
+
+    running: bool = False
+    current_request_id: str | None = None
+    current_started_at: datetime | None = None
+    last_started_at: datetime | None = None
+    last_finished_at: datetime | None = None
+    last_error: str | None = None
+    last_trigger: str | None = None
+    last_processed_regions: int = 0
+    last_timestamp: datetime | None = None
+    total_regions: int = 0
+    selected_regions: int = 0
+    current_region_limit: int | None = None
+
+
+workflow_runtime_state = RuntimeState()
+
+
+def _swap_runtime_state(**fields: Any) -> None:
+    global workflow_runtime_state
+    workflow_runtime_state = replace(workflow_runtime_state, **fields)
 WORKFLOW_LOCK_KEY = "ghws:workflow:running"
 LAST_WORKFLOW_STATE_KEY = "ghws:workflow:last_state"
 WORKFLOW_ABORT_KEY_PREFIX = "ghws:workflow:abort:"
 WORKFLOW_HEARTBEAT_KEY_PREFIX = "ghws:workflow:hb:"
+WORKFLOW_RESULTS_KEY_PREFIX = "ghws:workflow:results:"
 
 workflow_abort_flags: set[str] = set()
 
+# Aborts are rare and user-initiated; remembering a negative Redis answer for
+# a couple of seconds spares the per-batch EXISTS on normal runs while keeping
+# abort latency under one batch.
+_abort_check_cache: Dict[str, tuple[float, bool]] = {}
+_ABORT_CACHE_TTL_SECONDS = 2.0
+
+# The UI polls workflow status several times per second during a run; each
+# poll used to hit Redis (lock probe when idle, last-state read when
+# running). Reusing the answer for half a second collapses a polling burst
+# into one round trip without visible staleness.
+_status_probe_cache: Dict[str, tuple[float, Any]] = {}
+_STATUS_PROBE_TTL_SECONDS = 0.5
+
+# Idle status responses keyed by RuntimeState identity: every write swaps in
+# a new snapshot object, so `is` doubles as a version check and the pydantic
+# model is only rebuilt after an actual state transition.
+_cached_status_response: tuple[Any, WorkflowStatusResponse] | None = None
+
+# One pool + client for the whole module. Redis.from_url per call built a
+# fresh connection pool (and socket) every time; the shared client is
+# thread-safe and connects lazily, so import stays side-effect free.
+_redis_pool = ConnectionPool.from_url(
+    settings.redis_url, max_connections=settings.redis_max_connections
+)
+_redis_client = Redis(connection_pool=_redis_pool)
+
+# Async twin for one-off commands issued directly from async endpoints
+# (large publish, lock delete) so they don't block the event loop; the
+# sync client stays for code that also runs in the threadpool.
+_async_redis_pool = aioredis.ConnectionPool.from_url(
+    settings.redis_url, max_connections=settings.redis_max_connections
+)
+_async_redis_client = aioredis.Redis(connection_pool=_async_redis_pool)
+
+
+def _async_redis() -> aioredis.Redis:
+    return _async_redis_client
+
+
+# Lock acquisition with stale takeover used to be a GET/EXISTS/DEL/SET NX
+# sequence of round trips, racy between the heartbeat check and the DEL.
+# These scripts run server-side, so the whole decision is atomic and a
+# single round trip. register_script only hashes locally; nothing connects
+# at import time.
+_acquire_workflow_lock = _redis_client.register_script(
+    """
+    local owner = redis.call('GET', KEYS[1])
+    if not owner then
+        redis.call('SET', KEYS[1], ARGV[1], 'EX', tonumber(ARGV[2]))
+        return 1
+    end
+    if redis.call('EXISTS', ARGV[3] .. owner) == 1 then
+        return 0
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', tonumber(ARGV[2]))
+    return 1
+    """
+)
+
+_clear_stale_workflow_lock = _redis_client.register_script(
+    """
+    local owner = redis.call('GET', KEYS[1])
+    if not owner then
+        return 0
+    end
+    if redis.call('EXISTS', ARGV[1] .. owner) == 1 then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    return 1
+    """
+)
+
+
+def _redis() -> Redis:
+    return _redis_client
+
+
+def _json_dumps(payload: Any) -> str:
+    # The per-batch publishes and state snapshots serialize hundreds of region
+    # rows; orjson encodes them several times faster when available.
+    if orjson is not None:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _json_dumps_bytes(payload: Any) -> bytes:
+    # For values handed straight to redis-py, which encodes str arguments to
+    # bytes anyway: encoding once here skips that round trip (and orjson
+    # already produces bytes natively).
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(text: Any) -> Any:
+    # Counterpart of _json_dumps: last-state snapshots carry full result
+    # arrays, so the faster decoder matters on the status read path too.
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
 
 def _abort_key(request_id: str) -> str:
     return f"{WORKFLOW_ABORT_KEY_PREFIX}{request_id}"
@@ -70,16 +202,59 @@ def _hb_key(request_id: str) -> str:
     return f"{WORKFLOW_HEARTBEAT_KEY_PREFIX}{request_id}"
 
 
-def _touch_heartbeat(request_id: str | None) -> None:
+def _results_key(request_id: str) -> str:
+    return f"{WORKFLOW_RESULTS_KEY_PREFIX}{request_id}"
+
+
+def _clear_results_buffer(request_id: str | None) -> None:
+    if not request_id:
+        return
+    try:
+        _redis().delete(_results_key(request_id))
+    except Exception:
+        pass
+
+
+# The workflow loop touches the heartbeat at several points per batch while
+# the 20s background loop already keeps it fresh against a 180s TTL; writes
+# closer together than this add nothing, so they are short-circuited locally.
+_last_hb_monotonic: Dict[str, float] = {}
+_HB_MIN_INTERVAL_SECONDS = 15.0
+
+
+def _touch_heartbeat(request_id: str | None, pipe: Any = None, *, force: bool = False) -> None:
     """
     Heartbeat exists to detect stale Redis locks after uvicorn --reload restarts.
+    Pass a pipeline as `pipe` to queue the SET instead of sending it immediately.
+    `force` skips the local write throttle (used when the key must exist now).
     """
     if not request_id:
         return
+    now = time.monotonic()
+    if not force and now - _last_hb_monotonic.get(request_id, 0.0) < _HB_MIN_INTERVAL_SECONDS:
+        return
     try:
-        redis_client = Redis.from_url(settings.redis_url)
+        client = pipe if pipe is not None else _redis()
         # Short TTL so stale locks self-heal quickly; a background heartbeat loop refreshes it.
-        redis_client.set(_hb_key(request_id), datetime.utcnow().isoformat(), ex=3 * 60)
+        client.set(_hb_key(request_id), datetime.utcnow().isoformat(), ex=3 * 60)
+        _last_hb_monotonic[request_id] = now
+    except Exception:
+        pass
+
+
+def _refresh_heartbeat(request_id: str | None) -> None:
+    """Extend the heartbeat TTL without rewriting the value.
+
+    EXPIRE is a fixed-size command, so the 20s refresh loop stops shipping a
+    fresh ISO timestamp on every tick. If the key vanished (Redis restart,
+    manual cleanup) EXPIRE returns 0 and the full SET recreates it.
+    """
+    if not request_id:
+        return
+    try:
+        if not _redis().expire(_hb_key(request_id), 3 * 60):
+            # Bypass the throttle: the key is gone and must be recreated.
+            _touch_heartbeat(request_id, force=True)
     except Exception:
         pass
 
@@ -87,8 +262,9 @@ def _touch_heartbeat(request_id: str | None) -> None:
 def _clear_heartbeat(request_id: str | None) -> None:
     if not request_id:
         return
+    _last_hb_monotonic.pop(request_id, None)
     try:
-        redis_client = Redis.from_url(settings.redis_url)
+        redis_client = _redis()
         redis_client.delete(_hb_key(request_id))
     except Exception:
         pass
@@ -96,7 +272,7 @@ def _clear_heartbeat(request_id: str | None) -> None:
 
 def _redis_lock_owner() -> str | None:
     try:
-        redis_client = Redis.from_url(settings.redis_url)
+        redis_client = _redis()
         raw_lock = redis_client.get(WORKFLOW_LOCK_KEY)
         if not raw_lock:
             return None
@@ -109,7 +285,7 @@ def _redis_has_heartbeat(request_id: str | None) -> bool:
     if not request_id:
         return False
     try:
-        redis_client = Redis.from_url(settings.redis_url)
+        redis_client = _redis()
         return bool(redis_client.exists(_hb_key(request_id)))
     except Exception:
         return False
@@ -120,59 +296,85 @@ def _maybe_clear_stale_redis_lock() -> bool:
     Clear Redis lock if it exists but has no heartbeat.
     This prevents "ghost running" after server reloads/restarts.
     """
-    owner = _redis_lock_owner()
-    if not owner:
-        return False
-    if _redis_has_heartbeat(owner):
-        return False
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        redis_client.delete(WORKFLOW_LOCK_KEY)
+        return bool(
+            _clear_stale_workflow_lock(
+                keys=[WORKFLOW_LOCK_KEY],
+                args=[WORKFLOW_HEARTBEAT_KEY_PREFIX],
+            )
+        )
     except Exception:
         return False
-    return True
 
-def _set_abort_flag(request_id: str) -> None:
+def _clear_abort_flag(request_id: str | None) -> None:
     if not request_id:
         return
-    workflow_abort_flags.add(request_id)
+    workflow_abort_flags.discard(request_id)
+    _abort_check_cache.pop(request_id, None)
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        # Keep a short TTL so stale keys don't linger.
-        redis_client.set(_abort_key(request_id), "1", ex=6 * 60 * 60)
+        redis_client = _redis()
+        redis_client.delete(_abort_key(request_id))
     except Exception:
         pass
 
 
-def _clear_abort_flag(request_id: str | None) -> None:
+def _cached_abort_state(request_id: str) -> bool | None:
+    cached = _abort_check_cache.get(request_id)
+    if cached is not None and time.monotonic() - cached[0] < _ABORT_CACHE_TTL_SECONDS:
+        return cached[1]
+    return None
+
+
+def _is_abort_requested(request_id: str | None) -> bool:
     if not request_id:
-        return
-    workflow_abort_flags.discard(request_id)
+        return False
+    if request_id in workflow_abort_flags:
+        return True
+    cached = _cached_abort_state(request_id)
+    if cached is not None:
+        return cached
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        redis_client.delete(_abort_key(request_id))
+        redis_client = _redis()
+        flag = bool(redis_client.exists(_abort_key(request_id)))
     except Exception:
-        pass
+        return False
+    _abort_check_cache[request_id] = (time.monotonic(), flag)
+    return flag
 
 
-def _is_abort_requested(request_id: str | None) -> bool:
+def _check_abort_and_touch_heartbeat(request_id: str | None) -> bool:
+    """Fused per-batch check: abort EXISTS and heartbeat SET in one round trip."""
     if not request_id:
         return False
     if request_id in workflow_abort_flags:
         return True
+    # On a cache hit the heartbeat can be skipped too: background runs keep it
+    # fresh from the dedicated 20s heartbeat loop.
+    cached = _cached_abort_state(request_id)
+    if cached is not None:
+        return cached
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        return bool(redis_client.exists(_abort_key(request_id)))
+        with _redis().pipeline(transaction=False) as pipe:
+            pipe.exists(_abort_key(request_id))
+            _touch_heartbeat(request_id, pipe=pipe)
+            replies = pipe.execute()
+        flag = bool(replies[0])
     except Exception:
         return False
+    _abort_check_cache[request_id] = (time.monotonic(), flag)
+    return flag
 
 
-def _persist_last_state_to_redis(state: Dict[str, Any]) -> None:
+def _persist_last_state_to_redis(
+    state: Dict[str, Any], pipe: Any = None, *, raw: bytes | None = None
+) -> None:
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        redis_client.set(
+        client = pipe if pipe is not None else _redis()
+        client.set(
             LAST_WORKFLOW_STATE_KEY,
-            json.dumps(state, ensure_ascii=False),
+            # Callers that already hold the serialized state pass it in so
+            # the document is not encoded a second time.
+            raw if raw is not None else _json_dumps(state),
             ex=24 * 60 * 60,
         )
     except Exception:
@@ -181,7 +383,7 @@ def _persist_last_state_to_redis(state: Dict[str, Any]) -> None:
 
 def _load_last_state_from_redis() -> Dict[str, Any] | None:
     try:
-        redis_client = Redis.from_url(settings.redis_url)
+        redis_client = _redis()
         cached = redis_client.get(LAST_WORKFLOW_STATE_KEY)
         if not cached:
             return None
@@ -189,7 +391,7 @@ def _load_last_state_from_redis() -> Dict[str, Any] | None:
             text = cached.decode("utf-8", errors="ignore")
         else:
             text = str(cached)
-        parsed = json.loads(text or "{}")
+        parsed = _json_loads(text or "{}")
         if isinstance(parsed, dict):
             return parsed
     except Exception:
@@ -211,25 +413,42 @@ def _compute_timeout_seconds(*, expected_regions: int | None) -> int:
 
 
 def _reset_runtime_state(*, error: str | None = None) -> None:
-    workflow_runtime_state["running"] = False
-    workflow_runtime_state["current_request_id"] = None
-    workflow_runtime_state["current_started_at"] = None
-    workflow_runtime_state["last_finished_at"] = datetime.utcnow()
-    workflow_runtime_state["last_error"] = error
-    workflow_runtime_state["current_region_limit"] = None
-    workflow_runtime_state["total_regions"] = 0
-    workflow_runtime_state["selected_regions"] = 0
+    global workflow_runtime_state
+    workflow_runtime_state = replace(
+        workflow_runtime_state,
+        running=False,
+        current_request_id=None,
+        current_started_at=None,
+        last_finished_at=datetime.utcnow(),
+        last_error=error,
+        current_region_limit=None,
+        total_regions=0,
+        selected_regions=0,
+    )
 
 
 def _extract_confidence(meteorology: str | None) -> float | None:
     if not meteorology:
         return None
-    try:
-        parsed = json.loads(meteorology)
-    except Exception:
+    # Same fast path as routes/regions.py: slice the numeric literal out of
+    # the blob and only fall back to a full JSON parse for irregular payloads.
+    start = meteorology.find('"confidence"')
+    if start < 0:
         return None
-    value = parsed.get("confidence")
+    colon = meteorology.find(":", start + 12)
+    if colon >= 0:
+        end = colon + 1
+        length = len(meteorology)
+        while end < length and meteorology[end] not in ",}":
+            end += 1
+        if end < length:
+            try:
+                return max(0.0, min(1.0, float(meteorology[colon + 1 : end])))
+            except ValueError:
+                pass
     try:
+        parsed = _json_loads(meteorology)
+        value = parsed.get("confidence")
         if value is None:
             return None
         return max(0.0, min(1.0, float(value)))
@@ -237,6 +456,25 @@ def _extract_confidence(meteorology: str | None) -> float | None:
         return None
 
 
+@lru_cache(maxsize=1)
+def _regions_for_debug(_bucket: int) -> tuple[tuple[int, Any, Any], ...]:
+    """(id, code, name) snapshot for the randomize endpoint.
+
+    County-level admin divisions effectively never change, so consecutive
+    debug clicks reuse one snapshot instead of re-running a 3000-row
+    SELECT. Callers pass the current minute as the bucket, which both
+    keys the single-slot cache and expires it within 60s of a reseed.
+    """
+    db = SessionLocal()
+    try:
+        return tuple(
+            (rid, code, name)
+            for rid, code, name in db.execute(select(Region.id, Region.code, Region.name))
+        )
+    finally:
+        db.close()
+
+
 def _random_between(rng: Any, lo: float, hi: float) -> float:
     try:
         return float(lo) + (float(hi) - float(lo)) * float(rng.random())
@@ -254,14 +492,21 @@ def _pick_level_from_score(score: float) -> str:
     return "red"
 
 
+def _clamp(v: float, lo: float, hi: float) -> float:
+    return max(lo, min(hi, v))
+
+
 def _infer_hazards_from_features(*, rain_24h: float, rain_1h: float, soil_m: float, slope: float, fault: float) -> list[str]:
-    def _clamp(v: float, lo: float, hi: float) -> float:
-        return max(lo, min(hi, v))
+    # Shared sub-terms computed once instead of per score line.
+    slope_term = min(1.0, slope / 45.0)
+    rain_term = min(1.0, rain_24h / 120.0)
+    fault_term = min(1.0, 2.0 / max(0.4, fault))
+    soil_term = _clamp(soil_m, 0, 1)
 
-    landslide_score = 0.45 * min(1.0, slope / 45.0) + 0.35 * min(1.0, rain_24h / 120.0) + 0.2 * _clamp(soil_m, 0, 1)
-    debris_flow_score = 0.5 * min(1.0, rain_1h / 40.0) + 0.3 * min(1.0, rain_24h / 120.0) + 0.2 * min(1.0, slope / 45.0)
-    collapse_score = 0.6 * min(1.0, slope / 45.0) + 0.4 * min(1.0, 2.0 / max(0.4, fault))
-    subsidence_score = 0.7 * min(1.0, 2.0 / max(0.4, fault)) + 0.3 * _clamp(soil_m, 0, 1)
+    landslide_score = 0.45 * slope_term + 0.35 * rain_term + 0.2 * soil_term
+    debris_flow_score = 0.5 * min(1.0, rain_1h / 40.0) + 0.3 * rain_term + 0.2 * slope_term
+    collapse_score = 0.6 * slope_term + 0.4 * fault_term
+    subsidence_score = 0.7 * fault_term + 0.3 * soil_term
 
     scored = [
         ("滑坡", landslide_score),
@@ -274,9 +519,6 @@ def _infer_hazards_from_features(*, rain_24h: float, rain_1h: float, soil_m: flo
 
 
 def _risk_score_from_features(*, rain_24h: float, rain_1h: float, soil_m: float, wind: float, slope: float, fault: float, history_count: float) -> float:
-    def _clamp(v: float, lo: float, hi: float) -> float:
-        return max(lo, min(hi, v))
-
     rain_component = min(1.0, rain_24h / 120.0) * 35
     short_rain_component = min(1.0, rain_1h / 40.0) * 20
     soil_component = _clamp(soil_m, 0, 1) * 10
@@ -315,11 +557,13 @@ def _build_fallback_answer(
 
 
 def _pick_regions_for_run(
-    regions: List[Region],
+    regions: List[Any],
     region_limit: int | None,
     *,
     selection_seed: str | None = None,
-) -> tuple[List[Region], int, int]:
+) -> tuple[List[Any], int, int]:
+    # Accepts Region entities or column-projected Rows; only .code,
+    # .risk_level and .name are read.
     total = len(regions)
     if region_limit is None or int(region_limit) <= 0 or total <= int(region_limit):
         return list(regions), total, total
@@ -327,14 +571,20 @@ def _pick_regions_for_run(
     limit = max(1, int(region_limit))
     risk_rank = {"red": 0, "orange": 1, "yellow": 2, "green": 3}
 
-    def _priority(item: Region) -> tuple[int, int, int, str]:
+    # Precompute the sort keys in one pass instead of re-deriving them inside
+    # a key callable on every comparison setup; endswith results are shared
+    # between the city/province flags.
+    rank_get = risk_rank.get
+    keys: List[tuple[int, int, int, str]] = []
+    for item in regions:
         code = str(item.code or "")
-        level_rank = int(risk_rank.get(str(item.risk_level or "green"), 4))
-        is_city = 0 if (len(code) == 6 and code.endswith("00") and not code.endswith("0000")) else 1
-        is_province = 0 if (len(code) == 6 and code.endswith("0000")) else 1
-        return (level_rank, is_city, is_province, code)
-
-    ordered = sorted(regions, key=_priority)
+        is_six = len(code) == 6
+        ends_0000 = is_six and code.endswith("0000")
+        is_city = 0 if (is_six and code.endswith("00") and not ends_0000) else 1
+        is_province = 0 if ends_0000 else 1
+        keys.append((int(rank_get(str(item.risk_level or "green"), 4)), is_city, is_province, code))
+    order = sorted(range(len(regions)), key=keys.__getitem__)
+    ordered = [regions[i] for i in order]
 
     # For fast-mode batches, avoid always taking the first N regions.
     # Strategy:
@@ -352,7 +602,9 @@ def _pick_regions_for_run(
         return selected, total, len(selected)
 
     try:
-        seed_int = int(hashlib.sha256(selection_seed.encode("utf-8", errors="ignore")).hexdigest()[:8], 16)
+        # crc32 is plenty for a deterministic rotation offset and far cheaper
+        # than a cryptographic digest.
+        seed_int = zlib.crc32(selection_seed.encode("utf-8", errors="ignore"))
     except Exception:
         seed_int = 0
     offset = seed_int % len(tail)
@@ -361,16 +613,14 @@ def _pick_regions_for_run(
     return selected, total, len(selected)
 
 
-async def run_and_persist_warning_workflow(
-    force_llm: bool = True,
-    *,
-    region_limit: int | None = None,
-    request_id: str | None = None,
-    max_runtime_seconds: int | None = None,
-) -> Dict[str, Any]:
+def _load_selected_region_inputs(
+    region_limit: int | None, request_id: str | None
+) -> tuple[List[RegionInput], int, int]:
     db = SessionLocal()
     try:
-        regions = db.execute(select(Region)).scalars().all()
+        # Project to the three columns actually consumed instead of hydrating
+        # full Region entities (lat/lng/description/... for 3000+ rows).
+        regions = db.execute(select(Region.name, Region.code, Region.risk_level)).all()
         # Use request_id to rotate fast-mode selection batches.
         selected_regions, total_regions, selected_count = _pick_regions_for_run(
             regions,
@@ -378,9 +628,96 @@ async def run_and_persist_warning_workflow(
             selection_seed=request_id,
         )
         region_inputs: List[RegionInput] = [{"name": r.name, "code": r.code} for r in selected_regions]
+        return region_inputs, total_regions, selected_count
     finally:
         db.close()
 
+
+def _persist_group_results(
+    db_session: Session, results: List[Any], now: datetime
+) -> List[Dict[str, Any]]:
+    """Synchronous DB work for one batch; runs in the threadpool so the event
+    loop stays free for status polls and the heartbeat task."""
+    # One SELECT for the whole group instead of one per item, and one
+    # executemany INSERT for the warnings instead of per-row adds.
+    codes = [str(item.region_code) for item in results]
+    regions_by_code: Dict[str, Region] = {}
+    if codes:
+        regions_by_code = {
+            r.code: r
+            for r in db_session.execute(
+                select(Region).where(Region.code.in_(codes))
+            ).scalars()
+        }
+    created_codes: set[str] = set()
+    new_regions: List[Region] = []
+    for item in results:
+        code = str(item.region_code)
+        if code not in regions_by_code:
+            region = Region(name=item.region_name, code=code, risk_level=item.level)
+            regions_by_code[code] = region
+            created_codes.add(code)
+            new_regions.append(region)
+    if new_regions:
+        db_session.add_all(new_regions)
+        db_session.flush()
+
+    ws_results_chunk: List[Dict[str, Any]] = []
+    warning_rows: List[Dict[str, Any]] = []
+    for item in results:
+        code = str(item.region_code)
+        region = regions_by_code[code]
+        if code in created_codes:
+            created_codes.discard(code)
+        else:
+            region.risk_level = item.level
+            region.last_updated_at = now
+
+        met_payload = dict(item.meteorology or {})
+        met_payload["confidence"] = float(item.confidence)
+
+        warning_rows.append(
+            {
+                "region_id": region.id,
+                "level": item.level,
+                "reason": item.reason,
+                "meteorology": _json_dumps(met_payload),
+                "created_at": now,
+                "source": "langgraph-hybrid",
+            }
+        )
+
+        row = {
+            "region_id": region.id,
+            "region_code": item.region_code,
+            "region_name": item.region_name,
+            "level": item.level,
+            "reason": item.reason,
+            "confidence": float(item.confidence),
+            "meteorology": met_payload,
+        }
+        ws_results_chunk.append(row)
+
+    if warning_rows:
+        db_session.execute(insert(Warning), warning_rows)
+    db_session.commit()
+    return ws_results_chunk
+
+
+async def run_and_persist_warning_workflow(
+    force_llm: bool = True,
+    *,
+    region_limit: int | None = None,
+    request_id: str | None = None,
+    max_runtime_seconds: int | None = None,
+) -> Dict[str, Any]:
+    # The region fetch and the per-batch persistence below are synchronous
+    # SQLAlchemy; running them inline would block the event loop for the
+    # whole query, so they are offloaded to the threadpool.
+    region_inputs, total_regions, selected_count = await run_in_threadpool(
+        _load_selected_region_inputs, region_limit, request_id
+    )
+
     if not region_inputs:
         return {
             "timestamp": datetime.utcnow().isoformat(),
@@ -390,29 +727,40 @@ async def run_and_persist_warning_workflow(
         }
 
     def _group_by_prefix(items: List[RegionInput]) -> List[List[RegionInput]]:
+        # _pick_regions_for_run orders by risk level and rotates the tail, so
+        # codes arrive interleaved across prefixes; one dict pass is the
+        # cheapest way to bucket them (run-length grouping on input order
+        # would fragment provinces into many tiny batches).
         groups: Dict[str, List[RegionInput]] = {}
+        bucket_get = groups.get
         for it in items:
             code = str(it.get("code") or "")
             prefix = code[:2] if len(code) >= 2 else "__"
-            groups.setdefault(prefix, []).append(it)
+            bucket = bucket_get(prefix)
+            if bucket is None:
+                groups[prefix] = [it]
+            else:
+                bucket.append(it)
         # Split large groups into smaller batches so:
         # - partial results flush earlier
         # - user abort can stop sooner (between batches)
         batch_size = max(15, min(40, int(settings.collector_max_concurrency or 12) * 2))
         out: List[List[RegionInput]] = []
-        for k in sorted(groups.keys()):
-            chunk = groups[k]
+        for _, chunk in sorted(groups.items()):
             for i in range(0, len(chunk), batch_size):
                 out.append(chunk[i : i + batch_size])
         return out
 
-    started_at = datetime.utcnow()
     now = datetime.utcnow()
+    now_iso = now.isoformat()
+    # Monotonic clock for the runtime budget: immune to NTP/wall-clock jumps
+    # and avoids a datetime allocation per batch.
+    loop_start = time.monotonic()
     groups = _group_by_prefix(region_inputs)
 
     db_session = SessionLocal()
     try:
-        redis_client = Redis.from_url(settings.redis_url)
+        redis_client = _redis()
         _touch_heartbeat(request_id)
 
         all_results_by_code: Dict[str, Dict[str, Any]] = {}
@@ -420,11 +768,23 @@ async def run_and_persist_warning_workflow(
         partial = False
         aborted = False
 
+        # Constant fields of the per-batch delta message, encoded once.
+        # Built as bytes: the payload goes straight to Redis PUBLISH, so a
+        # str would only be encoded again inside redis-py.
+        delta_prefix = (
+            b'{"timestamp":'
+            + _json_dumps_bytes(now_iso)
+            + b',"total_regions":'
+            + str(int(total_regions)).encode("ascii")
+            + b',"selected_regions":'
+            + str(int(selected_count)).encode("ascii")
+            + b","
+        )
+
         global last_workflow_state
         last_workflow_state = {
             "request_id": request_id,
-            "timestamp": now.isoformat(),
-            "results": [],
+            "timestamp": now_iso,
             "force_llm": force_llm,
             "total_regions": int(total_regions),
             "selected_regions": int(selected_count),
@@ -434,85 +794,49 @@ async def run_and_persist_warning_workflow(
         _persist_last_state_to_redis(last_workflow_state)
         if request_id:
             async with workflow_state_lock:
-                if workflow_runtime_state.get("current_request_id") == request_id:
-                    workflow_runtime_state["last_processed_regions"] = 0
+                if workflow_runtime_state.current_request_id == request_id:
+                    _swap_runtime_state(last_processed_regions=0)
 
         for group in groups:
-            if _is_abort_requested(request_id):
+            if _check_abort_and_touch_heartbeat(request_id):
                 aborted = True
                 partial = True
                 break
             if max_runtime_seconds is not None:
-                elapsed = (datetime.utcnow() - started_at).total_seconds()
+                elapsed = time.monotonic() - loop_start
                 if elapsed >= max(10, int(max_runtime_seconds)):
                     partial = True
                     break
 
-            _touch_heartbeat(request_id)
             result = await run_warning_workflow(timestamp=now, regions=group, force_llm=force_llm)
 
-            ws_results_chunk: List[Dict[str, Any]] = []
-            for item in result.results:
-                processed += 1
-                region = (
-                    db_session.execute(select(Region).where(Region.code == item.region_code))
-                    .scalars()
-                    .first()
-                )
-                if region is None:
-                    region = Region(name=item.region_name, code=item.region_code, risk_level=item.level)
-                    db_session.add(region)
-                    db_session.flush()
-                else:
-                    region.risk_level = item.level
-                    region.last_updated_at = now
-
-                met_payload = dict(item.meteorology or {})
-                met_payload["confidence"] = float(item.confidence)
-
-                warning = Warning(
-                    region_id=region.id,
-                    level=item.level,
-                    reason=item.reason,
-                    meteorology=json.dumps(met_payload, ensure_ascii=False),
-                    created_at=now,
-                    source="langgraph-hybrid",
-                )
-                db_session.add(warning)
-
-                row = {
-                    "region_id": region.id,
-                    "region_code": item.region_code,
-                    "region_name": item.region_name,
-                    "level": item.level,
-                    "reason": item.reason,
-                    "confidence": float(item.confidence),
-                    "meteorology": met_payload,
-                }
-                all_results_by_code[str(item.region_code)] = row
-                ws_results_chunk.append(row)
-
-            db_session.commit()
-            _touch_heartbeat(request_id)
+            ws_results_chunk = await run_in_threadpool(
+                _persist_group_results, db_session, result.results, now
+            )
+            processed += len(ws_results_chunk)
+            for row in ws_results_chunk:
+                all_results_by_code[str(row["region_code"])] = row
 
             # Publish incremental updates (delta). Frontend merges by region_code.
-            delta_message = {
-                "timestamp": now.isoformat(),
-                "results": ws_results_chunk,
-                "total_regions": int(total_regions),
-                "selected_regions": int(selected_count),
-                "processed_regions": int(processed),
-                "partial": True,
-            }
-            try:
-                redis_client.publish("warnings_channel", json.dumps(delta_message, ensure_ascii=False))
-            except Exception:
-                pass
-
+            # Only processed_regions and results change between batches, so
+            # splice them after the constant header instead of re-encoding the
+            # whole message dict every iteration.
+            delta_payload = (
+                delta_prefix
+                + b'"processed_regions":'
+                + str(int(processed)).encode("ascii")
+                + b',"partial":true,"results":'
+                + _json_dumps_bytes(ws_results_chunk)
+                + b"}"
+            )
+            # Snapshotting the full results array here was O(processed) per
+            # batch, so a long run paid quadratic copy/serialize work. The
+            # per-batch snapshot is now a compact summary; the rows themselves
+            # go to a Redis list keyed by request_id, and the full results
+            # array is only serialized once in the final snapshot below.
             last_workflow_state = {
                 "request_id": request_id,
-                "timestamp": now.isoformat(),
-                "results": list(all_results_by_code.values()),
+                "timestamp": now_iso,
                 "force_llm": force_llm,
                 "total_regions": int(total_regions),
                 "selected_regions": int(selected_count),
@@ -520,18 +844,40 @@ async def run_and_persist_warning_workflow(
                 "partial": True,
                 "aborted": bool(aborted),
             }
-            _persist_last_state_to_redis(last_workflow_state)
+            # One round trip for heartbeat + delta publish + state snapshot
+            # instead of three.
+            try:
+                with redis_client.pipeline(transaction=False) as pipe:
+                    _touch_heartbeat(request_id, pipe=pipe)
+                    # Stream instead of pub/sub: capped history gives slow
+                    # subscribers replay instead of silent drops.
+                    pipe.xadd(
+                        "warnings_stream",
+                        {"payload": delta_payload},
+                        maxlen=1000,
+                        approximate=True,
+                    )
+                    _persist_last_state_to_redis(last_workflow_state, pipe=pipe)
+                    if request_id and ws_results_chunk:
+                        results_key = _results_key(request_id)
+                        pipe.rpush(results_key, *[_json_dumps_bytes(r) for r in ws_results_chunk])
+                        pipe.expire(results_key, 24 * 60 * 60)
+                    pipe.execute()
+            except Exception:
+                pass
             if request_id:
                 async with workflow_state_lock:
-                    if workflow_runtime_state.get("current_request_id") == request_id:
-                        workflow_runtime_state["last_processed_regions"] = int(processed)
-                        workflow_runtime_state["last_timestamp"] = datetime.utcnow()
-                        workflow_runtime_state["total_regions"] = int(total_regions)
-                        workflow_runtime_state["selected_regions"] = int(selected_count)
+                    if workflow_runtime_state.current_request_id == request_id:
+                        _swap_runtime_state(
+                            last_processed_regions=int(processed),
+                            last_timestamp=datetime.utcnow(),
+                            total_regions=int(total_regions),
+                            selected_regions=int(selected_count),
+                        )
 
         # Final snapshot (may be partial if max_runtime_seconds hit)
         final_message = {
-            "timestamp": now.isoformat(),
+            "timestamp": now_iso,
             "results": list(all_results_by_code.values()),
             "total_regions": int(total_regions),
             "selected_regions": int(selected_count),
@@ -549,6 +895,7 @@ async def run_and_persist_warning_workflow(
     finally:
         _clear_abort_flag(request_id)
         _clear_heartbeat(request_id)
+        _clear_results_buffer(request_id)
         db_session.close()
 
 
@@ -570,7 +917,7 @@ async def _run_workflow_in_background(
     async def _hb_loop() -> None:
         # Refresh heartbeat frequently so the lock can be treated as stale quickly after crashes.
         while not hb_stop.is_set():
-            _touch_heartbeat(request_id)
+            _refresh_heartbeat(request_id)
             try:
                 await asyncio.wait_for(hb_stop.wait(), timeout=20.0)
             except asyncio.TimeoutError:
@@ -622,28 +969,31 @@ async def _run_workflow_in_background(
         _clear_abort_flag(request_id)
         _clear_heartbeat(request_id)
         async with workflow_state_lock:
-            if workflow_runtime_state.get("current_request_id") == request_id:
-                workflow_runtime_state["running"] = False
-                workflow_runtime_state["current_request_id"] = None
-                workflow_runtime_state["current_started_at"] = None
-            workflow_runtime_state["last_finished_at"] = datetime.utcnow()
-            workflow_runtime_state["last_error"] = last_error
-            workflow_runtime_state["last_processed_regions"] = int(last_processed_regions)
-            workflow_runtime_state["last_timestamp"] = last_timestamp
+            updates: Dict[str, Any] = {
+                "last_finished_at": datetime.utcnow(),
+                "last_error": last_error,
+                "last_processed_regions": int(last_processed_regions),
+                "last_timestamp": last_timestamp,
+            }
+            if workflow_runtime_state.current_request_id == request_id:
+                updates.update(running=False, current_request_id=None, current_started_at=None)
             if total_regions > 0:
-                workflow_runtime_state["total_regions"] = total_regions
+                updates["total_regions"] = total_regions
             if selected_regions > 0:
-                workflow_runtime_state["selected_regions"] = selected_regions
+                updates["selected_regions"] = selected_regions
+            _swap_runtime_state(**updates)
 
         # Release distributed workflow lock if owned by current request.
         try:
-            redis_client = Redis.from_url(settings.redis_url)
+            redis_client = _redis()
             raw_lock = redis_client.get(WORKFLOW_LOCK_KEY)
             lock_owner = raw_lock.decode("utf-8") if isinstance(raw_lock, (bytes, bytearray)) else str(raw_lock or "")
             if lock_owner == request_id:
                 redis_client.delete(WORKFLOW_LOCK_KEY)
         except Exception:
             pass
+        # Run finished: drop memoized status probes so the next poll sees it.
+        _status_probe_cache.clear()
 
 
 async def _schedule_background_workflow(
@@ -657,8 +1007,8 @@ async def _schedule_background_workflow(
 
     stale_reset = False
     async with workflow_state_lock:
-        if workflow_runtime_state["running"]:
-            started_at_current = workflow_runtime_state.get("current_started_at")
+        if workflow_runtime_state.running:
+            started_at_current = workflow_runtime_state.current_started_at
             stale_threshold = timedelta(seconds=max_runtime + 60)
             if (
                 isinstance(started_at_current, datetime)
@@ -671,8 +1021,7 @@ async def _schedule_background_workflow(
 
     if stale_reset:
         try:
-            redis_client = Redis.from_url(settings.redis_url)
-            redis_client.delete(WORKFLOW_LOCK_KEY)
+            await _async_redis().delete(WORKFLOW_LOCK_KEY)
             logger.warning("stale workflow runtime state reset, lock cleared")
         except Exception:
             pass
@@ -701,33 +1050,36 @@ async def _schedule_background_workflow(
         pass
 
     # Acquire distributed lock to avoid duplicate background runs across workers/processes.
+    # The script takes the lock when it is free, or atomically takes over a
+    # stale one (owner without a heartbeat, e.g. after uvicorn --reload).
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        if not bool(redis_client.set(WORKFLOW_LOCK_KEY, request_id, nx=True, ex=max_runtime + 120)):
-            # With uvicorn --reload, the server can restart mid-run and leave a lock behind.
-            # If the lock owner has no heartbeat, we consider it stale and clear it once.
-            if _maybe_clear_stale_redis_lock():
-                if not bool(redis_client.set(WORKFLOW_LOCK_KEY, request_id, nx=True, ex=max_runtime + 120)):
-                    return False, None, None
-            else:
-                return False, None, None
+        if not bool(
+            _acquire_workflow_lock(
+                keys=[WORKFLOW_LOCK_KEY],
+                args=[request_id, max_runtime + 120, WORKFLOW_HEARTBEAT_KEY_PREFIX],
+            )
+        ):
+            return False, None, None
     except Exception:
         # Fallback to in-memory guard when Redis is temporarily unavailable.
         pass
 
     async with workflow_state_lock:
-        workflow_runtime_state["running"] = True
-        workflow_runtime_state["current_request_id"] = request_id
-        workflow_runtime_state["current_started_at"] = started_at
-        workflow_runtime_state["last_started_at"] = started_at
-        workflow_runtime_state["last_finished_at"] = None
-        workflow_runtime_state["last_error"] = None
-        workflow_runtime_state["last_trigger"] = trigger
-        workflow_runtime_state["current_region_limit"] = region_limit
-        workflow_runtime_state["total_regions"] = total_regions
-        workflow_runtime_state["selected_regions"] = selected_regions
+        _swap_runtime_state(
+            running=True,
+            current_request_id=request_id,
+            current_started_at=started_at,
+            last_started_at=started_at,
+            last_finished_at=None,
+            last_error=None,
+            last_trigger=trigger,
+            current_region_limit=region_limit,
+            total_regions=total_regions,
+            selected_regions=selected_regions,
+        )
 
     _touch_heartbeat(request_id)
+    _status_probe_cache.clear()
     asyncio.create_task(
         _run_workflow_in_background(
             request_id=request_id,
@@ -739,81 +1091,145 @@ async def _schedule_background_workflow(
     return True, request_id, started_at
 
 
+def _cached_status_probe(key: str, loader):
+    """Memoize a Redis read for the status endpoint for a short interval."""
+    hit = _status_probe_cache.get(key)
+    now = time.monotonic()
+    if hit is not None and now - hit[0] < _STATUS_PROBE_TTL_SECONDS:
+        return hit[1]
+    value = loader()
+    _status_probe_cache[key] = (now, value)
+    return value
+
+
+def _probe_foreign_lock() -> tuple[str | None, bool]:
+    owner = _redis_lock_owner()
+    if not owner:
+        return None, False
+    return owner, _redis_has_heartbeat(owner)
+
+
 def _build_workflow_status_response() -> WorkflowStatusResponse:
+    global _cached_status_response
+    snap = workflow_runtime_state
+
     # If this process thinks it's idle but Redis lock exists, it may be a lock owned by another process,
     # or a stale lock after restart. Heartbeat lets us distinguish them.
-    if not bool(workflow_runtime_state.get("running")):
-        owner = _redis_lock_owner()
+    if not snap.running:
+        owner, owner_alive = _cached_status_probe("foreign_lock", _probe_foreign_lock)
         if owner:
-            if not _redis_has_heartbeat(owner):
+            if not owner_alive:
                 _maybe_clear_stale_redis_lock()
+                _status_probe_cache.pop("foreign_lock", None)
             else:
-                workflow_runtime_state["running"] = True
-                workflow_runtime_state["current_request_id"] = owner
                 # started_at can be unknown after restart; keep None to avoid misleading elapsed.
-                workflow_runtime_state["current_started_at"] = workflow_runtime_state.get("current_started_at") or None
+                _swap_runtime_state(running=True, current_request_id=owner)
+                snap = workflow_runtime_state
+        else:
+            # Idle and no foreign lock: the response only depends on the
+            # snapshot, so reuse the one built for this exact object.
+            cached = _cached_status_response
+            if cached is not None and cached[0] is snap:
+                return cached[1]
 
-    current_started_at = workflow_runtime_state.get("current_started_at")
     elapsed = 0
-    if isinstance(current_started_at, datetime):
-        elapsed = max(0, int((datetime.utcnow() - current_started_at).total_seconds()))
+    if isinstance(snap.current_started_at, datetime):
+        elapsed = max(0, int((datetime.utcnow() - snap.current_started_at).total_seconds()))
 
     # While running, refresh progress from persisted last state so UI can show
     # "已处理 X 个地区" in near real-time across polling cycles.
-    if bool(workflow_runtime_state.get("running")):
-        cached = _load_last_state_from_redis()
+    if snap.running:
+        cached = _cached_status_probe("last_state", _load_last_state_from_redis)
         if isinstance(cached, dict):
-            rid = str(workflow_runtime_state.get("current_request_id") or "")
+            rid = str(snap.current_request_id or "")
             if rid and str(cached.get("request_id") or "") == rid:
+                updates: Dict[str, Any] = {}
                 try:
                     processed = int(cached.get("processed_regions", 0) or 0)
-                    if processed >= int(workflow_runtime_state.get("last_processed_regions", 0) or 0):
-                        workflow_runtime_state["last_processed_regions"] = processed
+                    if processed >= int(snap.last_processed_regions or 0):
+                        updates["last_processed_regions"] = processed
                 except Exception:
                     pass
                 try:
                     selected = int(cached.get("selected_regions", 0) or 0)
                     total = int(cached.get("total_regions", 0) or 0)
                     if selected > 0:
-                        workflow_runtime_state["selected_regions"] = selected
+                        updates["selected_regions"] = selected
                     if total > 0:
-                        workflow_runtime_state["total_regions"] = total
+                        updates["total_regions"] = total
                 except Exception:
                     pass
-
-    return WorkflowStatusResponse(
-        running=bool(workflow_runtime_state.get("running")),
-        current_request_id=workflow_runtime_state.get("current_request_id"),
-        current_started_at=current_started_at,
-        last_started_at=workflow_runtime_state.get("last_started_at"),
-        last_finished_at=workflow_runtime_state.get("last_finished_at"),
-        last_error=workflow_runtime_state.get("last_error"),
-        last_trigger=workflow_runtime_state.get("last_trigger"),
-        last_processed_regions=int(workflow_runtime_state.get("last_processed_regions", 0) or 0),
-        last_timestamp=workflow_runtime_state.get("last_timestamp"),
-        total_regions=int(workflow_runtime_state.get("total_regions", 0) or 0),
-        selected_regions=int(workflow_runtime_state.get("selected_regions", 0) or 0),
+                if updates:
+                    _swap_runtime_state(**updates)
+                    snap = workflow_runtime_state
+
+    response = WorkflowStatusResponse(
+        running=snap.running,
+        current_request_id=snap.current_request_id,
+        current_started_at=snap.current_started_at,
+        last_started_at=snap.last_started_at,
+        last_finished_at=snap.last_finished_at,
+        last_error=snap.last_error,
+        last_trigger=snap.last_trigger,
+        last_processed_regions=int(snap.last_processed_regions or 0),
+        last_timestamp=snap.last_timestamp,
+        total_regions=int(snap.total_regions or 0),
+        selected_regions=int(snap.selected_regions or 0),
         current_elapsed_seconds=elapsed,
     )
+    # Only idle responses are cacheable; while running, elapsed seconds and
+    # the Redis-refreshed progress change between polls.
+    if not snap.running:
+        _cached_status_response = (snap, response)
+    return response
 
 
 @router.get("", response_model=WarningListResponse)
 def list_warnings(db: Session = Depends(get_db)) -> WarningListResponse:
-    stmt = select(Warning).order_by(Warning.created_at.desc()).limit(600)
-    warnings = db.execute(stmt).scalars().all()
+    # Test rows are filtered in SQL, so the LIMIT applies to real warnings
+    # instead of over-fetching 600 rows and trimming in Python. Projecting
+    # the response columns skips ORM object construction and identity-map
+    # bookkeeping per row; meteorology stays in the projection because the
+    # API returns it and confidence is extracted from it.
+    stmt = (
+        select(
+            Warning.id,
+            Warning.region_id,
+            Warning.level,
+            Warning.reason,
+            Warning.meteorology,
+            Warning.created_at,
+            Warning.source,
+        )
+        .where(not_(_test_warning_clause()))
+        .order_by(Warning.created_at.desc())
+        .limit(200)
+    )
+    kept = db.execute(stmt).all()
+
+    # One IN query for all region names instead of a SELECT per warning.
+    name_by_id: Dict[int, str] = {}
+    region_ids = {w.region_id for w in kept if w.region_id is not None}
+    if region_ids:
+        name_by_id = dict(
+            db.execute(select(Region.id, Region.name).where(Region.id.in_(region_ids))).all()
+        )
 
     items = []
-    for warning in warnings:
-        if is_test_warning(source=warning.source, reason=warning.reason):
-            continue
-        warning_dict = WarningBase.model_validate(warning).model_dump()
-        warning_dict["confidence"] = _extract_confidence(warning.meteorology)
-        region = db.query(Region).filter(Region.id == warning.region_id).first()
-        if region:
-            warning_dict["region_name"] = region.name
-        items.append(warning_dict)
-        if len(items) >= 200:
-            break
+    for warning in kept:
+        items.append(
+            {
+                "id": warning.id,
+                "region_id": warning.region_id,
+                "level": warning.level,
+                "reason": warning.reason,
+                "meteorology": warning.meteorology,
+                "confidence": _extract_confidence(warning.meteorology),
+                "created_at": warning.created_at,
+                "source": warning.source,
+                "region_name": name_by_id.get(warning.region_id),
+            }
+        )
 
     return WarningListResponse(items=items, total=len(items))
 
@@ -865,8 +1281,8 @@ async def trigger_warning_workflow_async(
             accepted=False,
             running=True,
             message="已有主动刷新任务在运行，请稍后查看状态。",
-            started_at=workflow_runtime_state.get("current_started_at"),
-            request_id=workflow_runtime_state.get("current_request_id") or owner,
+            started_at=workflow_runtime_state.current_started_at,
+            request_id=workflow_runtime_state.current_request_id or owner,
         )
 
     return TriggerWorkflowAsyncResponse(
@@ -884,37 +1300,54 @@ async def trigger_warning_workflow_async(
 
 @router.get("/trigger/status", response_model=WorkflowStatusResponse)
 async def get_trigger_workflow_status() -> WorkflowStatusResponse:
-    async with workflow_state_lock:
-        return _build_workflow_status_response()
+    # Read without workflow_state_lock: the status builder grabs the frozen
+    # RuntimeState snapshot in one reference read, so UI polls no longer
+    # queue behind per-batch progress updates. The lock stays for compound
+    # start/finish transitions.
+    return _build_workflow_status_response()
 
 
 @router.post("/trigger/reset", response_model=WorkflowStatusResponse)
 async def reset_trigger_workflow_state() -> WorkflowStatusResponse:
-    current = workflow_runtime_state.get("current_request_id")
-    _clear_abort_flag(str(current) if current else None)
-    _clear_heartbeat(str(current) if current else None)
+    current = str(workflow_runtime_state.current_request_id or "")
+    # Local bookkeeping first, then one variadic DEL clears the abort flag,
+    # heartbeat and lock atomically — previously three separate round
+    # trips, two of them on sync clients blocking the event loop.
+    if current:
+        workflow_abort_flags.discard(current)
+        _abort_check_cache.pop(current, None)
+        _last_hb_monotonic.pop(current, None)
     async with workflow_state_lock:
         _reset_runtime_state(error="manual_reset")
-        workflow_runtime_state["last_trigger"] = "manual_reset"
+        _swap_runtime_state(last_trigger="manual_reset")
 
+    reset_keys = [WORKFLOW_LOCK_KEY]
+    if current:
+        reset_keys += [_abort_key(current), _hb_key(current)]
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        redis_client.delete(WORKFLOW_LOCK_KEY)
+        await _async_redis().delete(*reset_keys)
     except Exception:
         pass
+    _status_probe_cache.clear()
 
-    async with workflow_state_lock:
-        return _build_workflow_status_response()
+    return _build_workflow_status_response()
 
 
 @router.post("/trigger/abort", response_model=AbortWorkflowResponse)
 async def abort_trigger_workflow() -> AbortWorkflowResponse:
     async with workflow_state_lock:
-        if not bool(workflow_runtime_state.get("running")):
+        if not workflow_runtime_state.running:
             return AbortWorkflowResponse(ok=True, running=False, message="当前没有正在运行的主动刷新任务。", request_id=None)
-        request_id = str(workflow_runtime_state.get("current_request_id") or "")
+        request_id = str(workflow_runtime_state.current_request_id or "")
         if request_id:
-            _set_abort_flag(request_id)
+            workflow_abort_flags.add(request_id)
+            _abort_check_cache.pop(request_id, None)
+            try:
+                # Async SET keeps the loop free; a short TTL so stale keys
+                # don't linger.
+                await _async_redis().set(_abort_key(request_id), "1", ex=6 * 60 * 60)
+            except Exception:
+                pass
         return AbortWorkflowResponse(
             ok=True,
             running=True,
@@ -934,14 +1367,14 @@ async def reset_scraper_runtime(clear_cache: bool = False) -> dict:
 
 
 @router.post("/debug/randomize", response_model=DebugRandomizeResponse)
-async def debug_randomize_all_regions() -> DebugRandomizeResponse:
+async def debug_randomize_all_regions() -> Response | DebugRandomizeResponse:
     """
     Debug-only: generate a full random snapshot for all regions and push it via WS.
     - Does NOT call LangGraph/LLM/official APIs/scrapers.
     - Does NOT persist into DB (won't affect history counters).
     """
     async with workflow_state_lock:
-        if bool(workflow_runtime_state.get("running")):
+        if workflow_runtime_state.running:
             return DebugRandomizeResponse(
                 ok=False,
                 message="当前有主动刷新任务在运行，请先中止或等待结束后再使用随机模拟。",
@@ -950,20 +1383,32 @@ async def debug_randomize_all_regions() -> DebugRandomizeResponse:
                 results=[],
             )
 
+    import random as _random
+
     now = datetime.utcnow()
-    db = SessionLocal()
-    try:
-        regions = db.execute(select(Region)).scalars().all()
-        results: List[Dict[str, Any]] = []
-        for r in regions:
-            code = str(r.code or "")
-            # True random each click (seeded by time + region code)
-            rng = hashlib.sha256(f"{now.isoformat()}::{code}".encode("utf-8", errors="ignore")).digest()
-            # use small deterministic PRNG from digest but unique per click
-            seed = int.from_bytes(rng[:8], "big", signed=False)
-            import random as _random
+    # Debug randomness only needs decorrelated seeds, not cryptographic
+    # ones: hash the click timestamp once into a 64-bit base, then mix in
+    # a CRC of each region code. That swaps ~3000 SHA-256 digests for one
+    # blake2b plus a cheap crc32 and integer mix per region. One reseeded
+    # Random instance replaces per-region construction.
+    seed_base = int.from_bytes(
+        hashlib.blake2b(now.isoformat().encode("utf-8"), digest_size=8).digest(), "big"
+    )
+    rr = _random.Random()
 
-            rr = _random.Random(seed)
+    def _generate_snapshot() -> List[Dict[str, Any]]:
+        # The region fetch (cache miss) and the ~3000-iteration synthesis
+        # loop both block, so they run off the event loop the same way the
+        # workflow body does.
+        regions = _regions_for_debug(int(time.time() // 60))
+        results: List[Dict[str, Any]] = []
+        # Plain tuple unpacking: Row attribute lookups go through a
+        # name-resolution step per access, three times per region here.
+        for region_id, region_code, region_name in regions:
+            code = str(region_code or "")
+            # Deterministic per click + region code, unique across clicks.
+            code_mix = zlib.crc32(code.encode("utf-8", errors="ignore")) * 0x9E3779B97F4A7C15
+            rr.seed((seed_base ^ code_mix) & 0xFFFFFFFFFFFFFFFF)
 
             rain_24h = round(_random_between(rr, 0, 180) ** 0.85, 1)
             rain_1h = round(min(60.0, _random_between(rr, 0, 50) ** 0.9), 1)
@@ -1024,17 +1469,18 @@ async def debug_randomize_all_regions() -> DebugRandomizeResponse:
 
             results.append(
                 {
-                    "region_id": int(r.id),
+                    "region_id": int(region_id),
                     "region_code": code,
-                    "region_name": str(r.name or code),
+                    "region_name": str(region_name or code),
                     "level": level,
                     "reason": reason,
                     "confidence": float(confidence),
                     "meteorology": meteorology,
                 }
             )
-    finally:
-        db.close()
+        return results
+
+    results = await run_in_threadpool(_generate_snapshot)
 
     payload = {
         "timestamp": now.isoformat(),
@@ -1044,9 +1490,29 @@ async def debug_randomize_all_regions() -> DebugRandomizeResponse:
         "processed_regions": len(results),
         "partial": False,
     }
+    # The results list dominates the payload (~3000 nested dicts), so it is
+    # serialized exactly once; the pub/sub snapshot, the Redis last-state
+    # copy and the HTTP body all splice the same bytes.
+    ts_bytes = _json_dumps_bytes(payload["timestamp"])
+    results_bytes = _json_dumps_bytes(results)
+    count_bytes = str(len(results)).encode("ascii")
+    state_body = (
+        b'{"timestamp":' + ts_bytes
+        + b',"results":' + results_bytes
+        + b',"total_regions":' + count_bytes
+        + b',"selected_regions":' + count_bytes
+        + b',"processed_regions":' + count_bytes
+        + b',"partial":false}'
+    )
     try:
-        redis_client = Redis.from_url(settings.redis_url)
-        redis_client.publish("warnings_channel", json.dumps(payload, ensure_ascii=False))
+        # The full-snapshot payload is large; the async xadd keeps the
+        # event loop free while it goes out.
+        await _async_redis().xadd(
+            "warnings_stream",
+            {"payload": state_body},
+            maxlen=1000,
+            approximate=True,
+        )
     except Exception:
         pass
 
@@ -1054,72 +1520,94 @@ async def debug_randomize_all_regions() -> DebugRandomizeResponse:
     # but we do NOT mark workflow running nor persist warnings into DB.
     global last_workflow_state
     last_workflow_state = payload
-    _persist_last_state_to_redis(payload)
-
-    return DebugRandomizeResponse(
-        ok=True,
-        message="已生成全量随机模拟数据并推送到前端（不入库）。",
-        timestamp=payload["timestamp"],
-        total_regions=len(results),
-        results=results,
+    _persist_last_state_to_redis(payload, raw=state_body)
+
+    http_body = (
+        b'{"ok":true,"message":'
+        + _json_dumps_bytes("已生成全量随机模拟数据并推送到前端（不入库）。")
+        + b',"timestamp":' + ts_bytes
+        + b',"total_regions":' + count_bytes
+        + b',"results":' + results_bytes
+        + b"}"
     )
+    # Raw Response skips pydantic validating + re-encoding the 3000-item
+    # list; the decorator's response_model still documents the shape.
+    return Response(content=http_body, media_type="application/json")
+
+
+def _test_warning_clause():
+    """True for rows is_test_warning would flag; evaluated in the database."""
+    return test_warning_sql_clause(Warning.source, Warning.reason)
 
 
 @router.post("/cleanup-test-data", response_model=CleanupTestWarningsResponse)
 def cleanup_test_warnings(db: Session = Depends(get_db)) -> CleanupTestWarningsResponse:
-    all_warnings = db.execute(select(Warning)).scalars().all()
-
-    test_warning_ids: List[int] = []
-    affected_region_ids: set[int] = set()
-    for warning in all_warnings:
-        if is_test_warning(source=warning.source, reason=warning.reason):
-            test_warning_ids.append(int(warning.id))
-            affected_region_ids.add(int(warning.region_id))
+    is_test = _test_warning_clause()
 
-    if not test_warning_ids:
+    affected_region_ids = set(
+        db.execute(select(Warning.region_id).where(is_test).distinct()).scalars().all()
+    )
+    if not affected_region_ids:
         return CleanupTestWarningsResponse(
             deleted_warnings=0,
             affected_regions=0,
             message="未发现测试预警数据。",
         )
 
-    db.query(Warning).filter(Warning.id.in_(test_warning_ids)).delete(synchronize_session=False)
+    deleted = db.execute(delete(Warning).where(is_test)).rowcount or 0
+
+    # Roll each affected region back to its latest surviving warning with one
+    # window-function query instead of a SELECT ... LIMIT 20 per region.
+    rn = (
+        func.row_number()
+        .over(partition_by=Warning.region_id, order_by=Warning.created_at.desc())
+        .label("rn")
+    )
+    ranked = (
+        select(Warning.region_id, Warning.level, Warning.created_at, rn)
+        .where(not_(is_test), Warning.region_id.in_(affected_region_ids))
+        .subquery()
+    )
+    latest_by_region = {
+        row.region_id: row
+        for row in db.execute(
+            select(ranked.c.region_id, ranked.c.level, ranked.c.created_at).where(ranked.c.rn == 1)
+        )
+    }
 
     now = datetime.utcnow()
+    level_by_id: Dict[int, str] = {}
+    ts_by_id: Dict[int, Any] = {}
+    green_ids: List[int] = []
     for region_id in affected_region_ids:
-        region = db.get(Region, region_id)
-        if region is None:
-            continue
+        latest = latest_by_region.get(region_id)
+        if latest is not None:
+            level_by_id[region_id] = latest.level
+            ts_by_id[region_id] = latest.created_at
+        else:
+            green_ids.append(region_id)
 
-        candidates = (
-            db.execute(
-                select(Warning)
-                .where(Warning.region_id == region_id)
-                .order_by(Warning.created_at.desc())
-                .limit(20)
+    if level_by_id:
+        # One CASE-dispatched UPDATE instead of an executemany: psycopg2 runs
+        # executemany as one round trip per row, so this is R statements -> 1.
+        db.execute(
+            update(Region)
+            .where(Region.id.in_(level_by_id))
+            .values(
+                risk_level=case(level_by_id, value=Region.id),
+                last_updated_at=case(ts_by_id, value=Region.id),
             )
-            .scalars()
-            .all()
         )
-        latest_non_test = next(
-            (
-                w
-                for w in candidates
-                if not is_test_warning(source=w.source, reason=w.reason)
-            ),
-            None,
+    if green_ids:
+        db.execute(
+            update(Region)
+            .where(Region.id.in_(green_ids))
+            .values(risk_level="green", last_updated_at=now)
         )
 
-        if latest_non_test:
-            region.risk_level = latest_non_test.level
-            region.last_updated_at = latest_non_test.created_at
-        else:
-            region.risk_level = "green"
-            region.last_updated_at = now
-
     db.commit()
     return CleanupTestWarningsResponse(
-        deleted_warnings=len(test_warning_ids),
+        deleted_warnings=int(deleted),
         affected_regions=len(affected_region_ids),
         message="测试预警数据清理完成。",
     )
@@ -1129,39 +1617,44 @@ async def chat_with_region_warning_context(
     payload: RegionChatRequest,
     db: Session = Depends(get_db),
 ) -> RegionChatResponse:
-    region = (
-        db.execute(select(Region).where(Region.code == payload.region_code).limit(1))
-        .scalars()
-        .first()
-    )
+    def _load_chat_rows() -> tuple[Region | None, Warning | None]:
+        # Sync Session work runs off the event loop; this handler is async
+        # for the LLM call, and a slow database must not stall other
+        # requests while it blocks.
+        region = (
+            db.execute(select(Region).where(Region.code == payload.region_code).limit(1))
+            .scalars()
+            .first()
+        )
+        if region is None:
+            return None, None
+        # The test-warning filter runs in the WHERE clause, so the database
+        # returns exactly the one row this endpoint uses instead of a 20-row
+        # candidate window filtered in Python.
+        latest = (
+            db.execute(
+                select(Warning)
+                .where(Warning.region_id == region.id, not_(_test_warning_clause()))
+                .order_by(Warning.created_at.desc())
+                .limit(1)
+            )
+            .scalars()
+            .first()
+        )
+        return region, latest
+
+    region, latest_warning = await run_in_threadpool(_load_chat_rows)
     if region is None:
         raise HTTPException(status_code=404, detail="Region not found")
 
-    warning_candidates = (
-        db.execute(
-            select(Warning)
-            .where(Warning.region_id == region.id)
-            .order_by(Warning.created_at.desc())
-            .limit(20)
-        )
-        .scalars()
-        .all()
-    )
-    latest_warning = next(
-        (
-            w
-            for w in warning_candidates
-            if not is_test_warning(source=w.source, reason=w.reason)
-        ),
-        None,
-    )
-
     risk_level = latest_warning.level if latest_warning else region.risk_level
     reason = latest_warning.reason if latest_warning else None
     meteorology: Dict[str, Any] = {}
     if latest_warning and latest_warning.meteorology:
         try:
-            meteorology = json.loads(latest_warning.meteorology)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so the
+            # except clause below covers both decoders.
+            meteorology = _json_loads(latest_warning.meteorology)
         except json.JSONDecodeError:
             meteorology = {}
     confidence = _extract_confidence(latest_warning.meteorology if latest_warning else None)
@@ -1203,7 +1696,7 @@ async def chat_with_region_warning_context(
         "如果信息不足，要明确说明不确定性和缺失数据。"
         "输出简洁、可执行的中文建议。"
     )
-    user_content = json.dumps({"question": payload.question, "context": compact_context}, ensure_ascii=False)
+    user_content = _json_dumps({"question": payload.question, "context": compact_context})
 
     try:
         response = await llm_runtime.client.chat.completions.create(
@@ -1250,5 +1743,5 @@ async def get_last_collection() -> dict:
     if cached:
         return cached
     return last_workflow_state
-
-
+
+
@@ -33,6 +33,9 @@ def _find_header_row(rows: Iterable[Tuple[object, ...]], max_scan: int = 30) ->
     """
     Try to locate the header row by searching for '区站号' + '经度' + '纬度'.
     Returns: (row_index_0based, header_map)
+
+    Accepts a row iterator and consumes it only up to the header row, so a
+    caller passing a generator can keep iterating it for the data rows.
     """
     scanned = 0
     for idx, row in enumerate(rows):
@@ -67,10 +70,13 @@ def _read_stations_from_xlsx(path: str) -> List[Dict[str, object]]:
     try:
         # Prefer the active sheet; fall back to the first sheet.
         ws = wb.active or wb.worksheets[0]
-        rows = list(ws.iter_rows(values_only=True))
-        header_row_idx, header_map = _find_header_row(rows)
+        # Stream the sheet: _find_header_row consumes the generator up to the
+        # header, then the data loop continues from the next row. Avoids
+        # materializing tens of thousands of rows before parsing starts.
+        rows_iter = ws.iter_rows(values_only=True)
+        _, header_map = _find_header_row(rows_iter)
         stations: List[Dict[str, object]] = []
-        for row in rows[header_row_idx + 1 :]:
+        for row in rows_iter:
             try:
                 station_id = str(row[header_map["区站号"]] or "").strip()
                 lon = row[header_map["经度"]]
@@ -133,13 +139,28 @@ def build_map(
     out_path: str,
     *,
     overrides_path: str = "",
-    top_k: int = 1,
 ) -> Dict[str, object]:
     stations = _read_stations_from_xlsx(station_xlsx)
     regions = _read_regions_from_db()
     overrides = _load_json(overrides_path)
 
-    station_points = [(s["station_id"], float(s["longitude"]), float(s["latitude"])) for s in stations]
+    # Precompute a 3-D unit vector per station once. The nearest station
+    # maximizes the dot product with the region vector (chordal distance is
+    # monotonic in great-circle distance), so the inner loop is six
+    # multiply-adds instead of two trig-heavy haversine evaluations, and the
+    # sort-per-append top-k bookkeeping goes away — only the single nearest
+    # station was ever consumed for the output.
+    station_vecs: List[Tuple[str, float, float, float, float, float]] = []
+    for s in stations:
+        slon = float(s["longitude"])
+        slat = float(s["latitude"])
+        lon_r = math.radians(slon)
+        lat_r = math.radians(slat)
+        cos_lat = math.cos(lat_r)
+        station_vecs.append(
+            (str(s["station_id"]), cos_lat * math.cos(lon_r), cos_lat * math.sin(lon_r), math.sin(lat_r), slon, slat)
+        )
+
     mapping: Dict[str, str] = {}
 
     max_dist = 0.0
@@ -154,22 +175,27 @@ def build_map(
 
         lon = float(region["longitude"])
         lat = float(region["latitude"])
-        best: List[Tuple[float, str]] = []
-        for station_id, slon, slat in station_points:
-            d = _haversine_km(lon, lat, slon, slat)
-            if not best:
-                best = [(d, station_id)]
-            else:
-                # Keep a small sorted list of top_k.
-                best.append((d, station_id))
-                best.sort(key=lambda x: x[0])
-                if len(best) > top_k:
-                    best = best[:top_k]
-
-        if not best:
+        lon_r = math.radians(lon)
+        lat_r = math.radians(lat)
+        cos_lat = math.cos(lat_r)
+        x = cos_lat * math.cos(lon_r)
+        y = cos_lat * math.sin(lon_r)
+        z = math.sin(lat_r)
+
+        best_dot = -2.0
+        best_station: Tuple[str, float, float] | None = None
+        for station_id, sx, sy, sz, slon, slat in station_vecs:
+            dot = x * sx + y * sy + z * sz
+            if dot > best_dot:
+                best_dot = dot
+                best_station = (station_id, slon, slat)
+
+        if best_station is None:
             continue
-        # For now we only output the single nearest station id (string).
-        chosen_d, chosen = best[0]
+        chosen, slon, slat = best_station
+        # Exact distance only for the winner; haversine stays numerically
+        # stable for the small angles the stats report.
+        chosen_d = _haversine_km(lon, lat, slon, slat)
         mapping[code] = chosen
         max_dist = max(max_dist, chosen_d)
         sum_dist += chosen_d
@@ -213,7 +239,7 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    meta = build_map(args.station_xlsx, args.out, overrides_path=args.overrides, top_k=1)
+    meta = build_map(args.station_xlsx, args.out, overrides_path=args.overrides)
     print("OK")
     for k, v in meta.items():
         print(f"{k}: {v}")
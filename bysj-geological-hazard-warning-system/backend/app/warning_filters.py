@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import func, or_
 
 TEST_SOURCE_KEYWORDS = (
     "test",
@@ -20,20 +24,48 @@ TEST_REASON_KEYWORDS = (
 )
 
 
+# Alternation patterns compiled once: one C-level scan over the text
+# instead of a Python-level substring loop per keyword. IGNORECASE moves
+# case folding into the matcher, so no lowered copy of the input string
+# is allocated per call.
+_SOURCE_PATTERN = re.compile("|".join(map(re.escape, TEST_SOURCE_KEYWORDS)), re.IGNORECASE)
+_REASON_PATTERN = re.compile("|".join(map(re.escape, TEST_REASON_KEYWORDS)), re.IGNORECASE)
+
+
 def looks_like_test_source(source: Optional[str]) -> bool:
     if not source:
         return False
-    text = str(source).strip().lower()
-    return any(keyword in text for keyword in TEST_SOURCE_KEYWORDS)
+    return _SOURCE_PATTERN.search(str(source)) is not None
 
 
 def looks_like_test_reason(reason: Optional[str]) -> bool:
     if not reason:
         return False
-    text = str(reason).strip().lower()
-    return any(keyword in text for keyword in TEST_REASON_KEYWORDS)
+    return _REASON_PATTERN.search(str(reason)) is not None
 
 
-def is_test_warning(*, source: Optional[str], reason: Optional[str]) -> bool:
+def test_warning_sql_clause(source_col: Any, reason_col: Any) -> Any:
+    """SQL mirror of is_test_warning, true for test rows.
+
+    Lets listings and cleanup filter in the database instead of fetching
+    rows to run the Python matcher. NULL reasons coalesce to '' so rows
+    flagged only by their source still match.
+    """
+    source_text = func.lower(source_col)
+    reason_text = func.lower(func.coalesce(reason_col, ""))
+    return or_(
+        *[source_text.contains(keyword) for keyword in TEST_SOURCE_KEYWORDS],
+        *[reason_text.contains(keyword) for keyword in TEST_REASON_KEYWORDS],
+    )
+
+
+@lru_cache(maxsize=4096)
+def _is_test_warning_cached(source: Optional[str], reason: Optional[str]) -> bool:
     return looks_like_test_source(source) or looks_like_test_reason(reason)
 
+
+def is_test_warning(*, source: Optional[str], reason: Optional[str]) -> bool:
+    # The same (source, reason) pairs recur across regions and workflow
+    # runs, so the keyword scans are memoized on the full strings.
+    return _is_test_warning_cached(source, reason)
+
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import List, Set
+import zlib
+from typing import Any, Dict
 
 from fastapi import WebSocket
 from redis import asyncio as aioredis
@@ -13,53 +13,138 @@ settings = get_settings()
 
 
 class ConnectionManager:
+    # 有界队列：慢客户端最多积压这么多帧，之后丢最旧的，防止内存膨胀
+    _QUEUE_MAXSIZE = 64
+
+    __slots__ = ("active_connections",)
+
     def __init__(self) -> None:
-        self.active_connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+        # 连接表按不可变快照维护：事件循环单线程内，整体替换引用即
+        # 原子操作，读方（broadcast）拿一个引用就是一致视图，不需要
+        # 每次广播付两回 Lock.acquire/release 的调度开销。
+        #
+        # 不变式（去锁的前提）：任何"读快照 → 重建 → 替换引用"序列
+        # 必须保持同步执行，中间不能插入 await；一旦让出事件循环，
+        # 并发的 connect/disconnect 就可能基于旧快照覆盖彼此的修改。
+        self.active_connections: Dict[WebSocket, asyncio.Queue] = {}
 
     async def connect(self, websocket: WebSocket) -> None:
         await websocket.accept()
-        async with self._lock:
-            self.active_connections.add(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._QUEUE_MAXSIZE)
+        self.active_connections = {**self.active_connections, websocket: queue}
+        # 每个连接一个常驻写协程，按自身速度消费队列；TCP 背压只会
+        # 堵到该连接自己，而不是整个广播。
+        asyncio.create_task(self._writer(websocket, queue))
 
     async def disconnect(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            self.active_connections.discard(websocket)
+        snapshot = self.active_connections
+        queue = snapshot.get(websocket)
+        if queue is None:
+            return
+        self.active_connections = {
+            ws: q for ws, q in snapshot.items() if ws is not websocket
+        }
+        self._put_dropping_oldest(queue, None)  # 通知写协程退出
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue) -> None:
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    return
+                await websocket.send(frame)
+        except Exception:
+            # 发送失败（断开等）：移除连接并结束写协程
+            await self.disconnect(websocket)
 
-    async def broadcast(self, message: str) -> None:
-        async with self._lock:
-            connections: List[WebSocket] = list(self.active_connections)
-        for connection in connections:
+    @staticmethod
+    def _put_dropping_oldest(queue: asyncio.Queue, item: Any) -> None:
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
             try:
-                await connection.send_text(message)
-            except Exception:
-                # 忽略单个连接的异常，并尝试移除
-                await self.disconnect(connection)
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                pass
+
+    async def broadcast(self, message: str | bytes) -> None:
+        # 编码一次并复用同一个 ASGI 帧：二进制帧让 N 个连接共享同一份字节。
+        payload = message.encode("utf-8") if isinstance(message, str) else message
+        frame = {"type": "websocket.send", "bytes": payload}
+        # 广播退化为 N 次指针入队，不等待任何网络 I/O，也不 await 锁。
+        for queue in self.active_connections.values():
+            self._put_dropping_oldest(queue, frame)
 
 
 async def redis_subscriber(manager: ConnectionManager) -> None:
     """
     在应用启动时运行的后台任务：
-    - 订阅 Redis `warnings_channel`
+    - 阻塞读取 Redis Stream `warnings_stream`
     - 收到消息后通过 WebSocket 广播给前端
     """
-    redis = aioredis.from_url(settings.redis_url, decode_responses=True)
-    pubsub = redis.pubsub()
-    await pubsub.subscribe("warnings_channel")
+    # 发布端本来就推送 UTF-8 字节；保持 bytes 直通，免去一次解码
+    # （订阅）+ 一次编码（每个连接广播）。连接走池，断线重连时复用
+    # 而不是重建客户端。
+    pool = aioredis.ConnectionPool.from_url(settings.redis_url, max_connections=4)
+    redis = aioredis.Redis(connection_pool=pool)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _coalesce_and_broadcast() -> None:
+        # 突发时把多条消息合并成一个 JSON 数组帧：压缩、组帧和 send
+        # 的开销按批摊薄；安静期单条消息仍按原对象格式下发。
+        while True:
+            first = await queue.get()
+            # 给同一突发的后续消息一个短窗口
+            await asyncio.sleep(0.005)
+            batch = [first]
+            while len(batch) < 64:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            payload = batch[0] if len(batch) == 1 else b"[" + b",".join(batch) + b"]"
+            # 压缩一次、所有连接共享同一份字节。permessage-deflate 会让
+            # 每个连接各自压缩同样的负载（CPU 随连接数线性增长），因此
+            # 服务端关闭了 deflate 协商，前端用 DecompressionStream 解压。
+            await manager.broadcast(zlib.compress(payload, 6))
 
+    consumer = asyncio.create_task(_coalesce_and_broadcast())
+    backoff = 0.5
+    # Stream 代替 pub/sub：pub/sub 断线期间的消息直接丢失，而 Stream 里
+    # 的条目由发布端按 MAXLEN 截断保留，重连后从 last_id 续读即可补上
+    # 瞬断窗口内的消息。每个 worker 各自 XREAD 全量条目（不用消费组：
+    # 组内竞争消费会把一条消息只投给一个 worker，破坏多 worker 扇出）。
+    last_id = "$"
     try:
-        async for message in pubsub.listen():
-            if message.get("type") != "message":
-                continue
-            data = message.get("data")
-            # 简单校验，可按需扩展
+        # 外层循环负责重连：Redis 瞬断（重启、网络抖动）以前会直接杀
+        # 死订阅任务，现在按指数退避重试，连接从池里取。
+        while True:
             try:
-                json.loads(data)
-            except Exception:
-                continue
-            await manager.broadcast(data)
+                while True:
+                    # block=1000ms 的服务端阻塞读，空闲时不空转
+                    entries = await redis.xread(
+                        {"warnings_stream": last_id}, count=100, block=1000
+                    )
+                    backoff = 0.5
+                    for _stream, messages in entries:
+                        for message_id, fields in messages:
+                            last_id = message_id
+                            data = fields.get(b"payload")
+                            if isinstance(data, str):
+                                data = data.encode("utf-8")
+                            # 发布端都在本应用内，这里只做 O(1) 的首字节检查挡掉
+                            # 明显非 JSON 的消息；完整解析每条只为校验纯属浪费。
+                            if not data or data[:1] not in (b"{", b"["):
+                                continue
+                            queue.put_nowait(data)
+            except (aioredis.ConnectionError, aioredis.TimeoutError, OSError):
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
     finally:
-        await pubsub.unsubscribe("warnings_channel")
-        await pubsub.close()
+        consumer.cancel()
         await redis.close()
 
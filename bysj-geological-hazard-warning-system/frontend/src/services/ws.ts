@@ -12,15 +12,34 @@ function openSocket() {
   const protocol = window.location.protocol === "https:" ? "wss" : "ws";
   const wsUrl = `${protocol}://${window.location.host}/ws/warnings`;
   socket = new WebSocket(wsUrl);
+  // 后端以二进制帧广播（zlib 压缩一次、所有连接共享字节）
+  socket.binaryType = "arraybuffer";
+
+  // 异步解压按到达顺序串行处理，避免帧乱序
+  let pending: Promise<void> = Promise.resolve();
+
+  async function decodeFrame(data: string | ArrayBuffer): Promise<string> {
+    if (typeof data === "string") {
+      return data;
+    }
+    const stream = new Blob([data])
+      .stream()
+      .pipeThrough(new DecompressionStream("deflate"));
+    return await new Response(stream).text();
+  }
 
   socket.onmessage = (event) => {
-    try {
-      const data = JSON.parse(event.data);
-      listeners.forEach((cb) => cb(data));
-    } catch {
-      // ignore
-    }
-  };
+    pending = pending.then(async () => {
+      try {
+        const data = JSON.parse(await decodeFrame(event.data));
+        // 后端可能把突发消息合并为一个数组帧
+        const items = Array.isArray(data) ? data : [data];
+        items.forEach((item) => listeners.forEach((cb) => cb(item)));
+      } catch {
+        // ignore
+      }
+    });
+  };
 
   socket.onclose = () => {
     socket = null;
@@ -43,4 +62,4 @@ export function connectWarningsWS(onMessage: Callback) {
 export function removeListener(cb: Callback) {
   listeners = listeners.filter((fn) => fn !== cb);
 }
-
+